@@ -7,7 +7,26 @@ import sys
 sys.path.append('src')
 
 from config import SimulationConfig, CONVECTION_PROB
-from simulate import MonteCarloSimulator
+from simulate import MonteCarloSimulator, run_parallel
+
+def _run_material(material_Q):
+    """Run one material in a worker process and return its final values."""
+    material, Q = material_Q
+    config = SimulationConfig.get_material_config(material, Q=Q)
+    data = MonteCarloSimulator(config).run()['data']
+    
+    if len(data['total_injected']) == 0:
+        return material, None
+    
+    hotspot_temp = data['hotspot_temperature'][-1] if len(data['hotspot_temperature']) > 0 else 0
+    return material, {
+        'total_injected': int(data['total_injected'][-1]),
+        'total_removed': int(data['total_removed'][-1]),
+        'total_convected': int(data['total_convected'][-1]),
+        'hotspot_temp': float(hotspot_temp),
+        'corrected_temp': float(config.apply_temperature_correction(hotspot_temp)),
+        'absolute_temp': float(config.correct_to_absolute(hotspot_temp))
+    }
 
 def check_convection_effectiveness():
     """Check convection effectiveness for different materials."""
@@ -18,21 +37,19 @@ def check_convection_effectiveness():
     materials = ['silver', 'copper', 'steel_carbon']
     Q = 20  # Standard test value
     
+    # Materials are independent runs, so simulate them in parallel
+    results = dict(run_parallel(_run_material, [(m, Q) for m in materials]))
+    
     for material in materials:
         print(f"\n{material.replace('_', ' ').title()}:")
         print("-" * 30)
         
-        # Create config and run simulation
-        config = SimulationConfig.get_material_config(material, Q=Q)
-        simulator = MonteCarloSimulator(config)
-        result = simulator.run()
-        
         # Get final values
-        data = result['data']
-        if data['total_injected'] and data['total_removed'] and data['total_convected']:
-            total_injected = data['total_injected'][-1]
-            total_removed = data['total_removed'][-1]
-            total_convected = data['total_convected'][-1]
+        values = results[material]
+        if values is not None:
+            total_injected = values['total_injected']
+            total_removed = values['total_removed']
+            total_convected = values['total_convected']
             
             # Calculate percentages
             total_lost = total_removed + total_convected
@@ -40,9 +57,9 @@ def check_convection_effectiveness():
             boundary_pct = (total_removed / total_lost * 100) if total_lost > 0 else 0
             
             # Get temperature
-            hotspot_temp = data['hotspot_temperature'][-1] if data['hotspot_temperature'] else 0
-            corrected_temp = config.apply_temperature_correction(hotspot_temp)
-            absolute_temp = corrected_temp + 21  # Add ambient temperature
+            hotspot_temp = values['hotspot_temp']
+            corrected_temp = values['corrected_temp']
+            absolute_temp = values['absolute_temp']
             
             print(f"  Simulation temperature: {hotspot_temp:.1f} packets")
             print(f"  Corrected temperature: {corrected_temp:.1f}°C")
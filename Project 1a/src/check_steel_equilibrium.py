@@ -7,6 +7,8 @@ import sys
 sys.path.append('src')
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend - plots are only saved to file
 import matplotlib.pyplot as plt
 from config import SimulationConfig
 from simulate import MonteCarloSimulator
@@ -35,8 +37,7 @@ def check_steel_equilibration():
     temps = np.array(data['hotspot_temperature'])
     
     # Apply temperature correction
-    corrected_temps = [config.apply_temperature_correction(t) for t in temps]
-    corrected_temps = np.array(corrected_temps)
+    corrected_temps = config.apply_temperature_correction_array(temps)
     
     print("\nTemperature Evolution Analysis:")
     print("-" * 30)
@@ -57,9 +58,8 @@ def check_steel_equilibration():
             std_temp = np.std(window_temps)
             cv = (std_temp / mean_temp) * 100 if mean_temp > 0 else 0
             
-            # Calculate temperature change rate
-            temp_gradient = np.gradient(window_temps, window_times[-1] - window_times[0]) if len(window_temps) > 1 else [0]
-            avg_rate = np.mean(np.abs(temp_gradient))
+            # Calculate temperature change rate (samples are evenly spaced by output_interval)
+            avg_rate = np.abs(np.diff(window_temps)).mean() / (window_times[1] - window_times[0])
             
             print(f"Last {window_time}s: Mean={mean_temp:.1f}°C, Std={std_temp:.2f}°C, CV={cv:.1f}%, Rate={avg_rate:.1f}°C/s")
     
@@ -79,8 +79,7 @@ def check_steel_equilibration():
         late_times = times[last_20_percent:]
         
         if len(late_temps) > 1:
-            late_gradient = np.gradient(late_temps, late_times[-1] - late_times[0])
-            avg_late_rate = np.mean(late_gradient)
+            avg_late_rate = np.diff(late_temps).mean() / (late_times[1] - late_times[0])
             
             print(f"Temperature rise rate in last 20%: {avg_late_rate:.2f}°C/s")
             
@@ -110,7 +109,7 @@ def check_steel_equilibration():
     os.makedirs(figures_dir, exist_ok=True)
     
     output_path = os.path.join(figures_dir, 'steel_equilibration_check.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.savefig(output_path, dpi=100, bbox_inches='tight')
     plt.close()
     
     print(f"\nPlot saved as: {output_path}")
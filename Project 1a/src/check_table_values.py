@@ -6,8 +6,23 @@ Check current simulation values to verify table consistency.
 import sys
 sys.path.append('src')
 
-from config import SimulationConfig
-from simulate import MonteCarloSimulator
+from config import SimulationConfig, MATERIAL_PROPERTIES
+from simulate import MonteCarloSimulator, run_parallel
+
+def _run_material(material_Q):
+    """Run one material in a worker process and return its final temperatures."""
+    material, Q = material_Q
+    config = SimulationConfig.get_material_config(material, Q=Q)
+    data = MonteCarloSimulator(config).run()['data']
+    
+    if len(data['hotspot_temperature']) == 0:
+        return material, None
+    
+    hotspot_temp = float(data['hotspot_temperature'][-1])
+    return material, {
+        'simulation_temp': hotspot_temp,
+        'corrected_temp': float(config.apply_temperature_correction(hotspot_temp))
+    }
 
 def check_current_table_values():
     """Check current simulation values for table verification."""
@@ -21,35 +36,26 @@ def check_current_table_values():
     
     results = {}
     
+    # Check that each material is still in our config
+    available = [m for m in materials if m in MATERIAL_PROPERTIES]
     for material in materials:
-        if material in ['steel_stainless']:
-            # Check if this material is still in our config
-            from config import MATERIAL_PROPERTIES
-            if material not in MATERIAL_PROPERTIES:
-                print(f"⚠️  {material} not in current configuration (removed earlier)")
-                continue
-        
+        if material not in available:
+            print(f"⚠️  {material} not in current configuration (removed earlier)")
+    
+    # Materials are independent runs, so simulate them in parallel
+    run_results = dict(run_parallel(_run_material, [(m, Q) for m in available]))
+    
+    for material in available:
         print(f"\n{material.replace('_', ' ').title()}:")
         print("-" * 30)
         
-        # Create config and run simulation
-        config = SimulationConfig.get_material_config(material, Q=Q)
-        simulator = MonteCarloSimulator(config)
-        result = simulator.run()
-        
         # Get final values
-        data = result['data']
-        if data['hotspot_temperature']:
-            hotspot_temp = data['hotspot_temperature'][-1]
-            corrected_temp = config.apply_temperature_correction(hotspot_temp)
-            
-            print(f"  Simulation temperature: {hotspot_temp:.1f} packets")
-            print(f"  Corrected temperature: {corrected_temp:.1f}°C")
+        values = run_results[material]
+        if values is not None:
+            print(f"  Simulation temperature: {values['simulation_temp']:.1f} packets")
+            print(f"  Corrected temperature: {values['corrected_temp']:.1f}°C")
             
-            results[material] = {
-                'simulation_temp': hotspot_temp,
-                'corrected_temp': corrected_temp
-            }
+            results[material] = values
     
     print(f"\n" + "="*50)
     print("SUMMARY FOR TABLE VERIFICATION:")
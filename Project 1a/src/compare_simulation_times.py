@@ -30,6 +30,10 @@ def estimate_simulation_times():
     test_times = [1.0, 2.0, 5.0]  # seconds
     runtimes = []
     
+    # One simulator for the whole scan, reset for each simulation time
+    simulator = MonteCarloSimulator(
+        SimulationConfig.get_material_config('steel_carbon', Q=20, t_max=max(test_times)))
+    
     for sim_time in test_times:
         print(f"Testing {sim_time}s simulation...")
         
@@ -38,7 +42,7 @@ def estimate_simulation_times():
         
         # Time the simulation
         start_time = time.time()
-        simulator = MonteCarloSimulator(config)
+        simulator.reset(config)
         result = simulator.run()
         end_time = time.time()
         
@@ -2,7 +2,10 @@
 Configuration module for Monte Carlo heat diffusion simulation.
 """
 
-from dataclasses import dataclass
+import copy
+import numbers
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from typing import Optional, Tuple, Dict
 import numpy as np
 
@@ -34,6 +37,10 @@ THERMAL_CONDUCTIVITY: Dict[str, float] = {
     'steel_stainless': 16,  # Steel, stainless (updated to match table)
 }
 
+# Material names and the list shown in unknown-material errors (computed once)
+_MATERIAL_NAMES: Tuple[str, ...] = tuple(MATERIAL_PROPERTIES.keys())
+_AVAILABLE_STR = ', '.join(_MATERIAL_NAMES)
+
 # --- SIMULATION PARAMETERS ---
 # Probability that a packet evaporates into the air per time step.
 # Calibrated for realistic heat sink temperatures based on industrial data.
@@ -42,6 +49,9 @@ THERMAL_CONDUCTIVITY: Dict[str, float] = {
 # Calibration: Adjusted to achieve ~30°C simulation temperature for copper
 CONVECTION_PROB = 0.004  # Realistic heat sink cooling (copper: ~50°C, silver: ~49°C)
 
+# Ambient temperature (°C) added to corrected temperatures for absolute values
+AMBIENT_TEMPERATURE = 21.0
+
 # Standard heat injection rates for steady-state studies (packets/step)
 STANDARD_Q_VALUES = [5, 10, 15, 20, 25, 30, 35, 40]
 
@@ -80,6 +90,12 @@ class SimulationConfig:
     # Fixed output parameters (standardized for all studies)
     output_interval: int = 100  # Steps between data collection - INCREASED for speed (was 50)
     save_snapshots: bool = True  # Save temperature field snapshots - FIXED
+    snapshot_stride: int = 1  # Keep a snapshot every snapshot_stride collection steps
+    
+    # Early stopping (off for production runs; useful for quick calibration runs)
+    early_stop: bool = False  # Stop run() once the hotspot temperature is steady
+    early_stop_window: int = 100  # Steps per averaging window
+    early_stop_tolerance: float = 0.01  # Max relative change between consecutive window means
     
     def __post_init__(self):
         """Validate and compute derived parameters."""
@@ -91,6 +107,9 @@ class SimulationConfig:
         if self.hotspot_center is None:
             self.hotspot_center = (self.Nx // 2, self.Ny // 2)
         
+        # Pre-compute the (x, y) grid cells inside the hot-spot disk
+        self.hotspot_cells = self._compute_hotspot_cells()
+        
         # Calculate move probability from diffusivity
         # From equation (4): α ≈ (Δr)²/(4Δt)
         self.move_probability = 4 * self.alpha * self.dt / (self.dx ** 2)
@@ -98,9 +117,34 @@ class SimulationConfig:
         # Calculate total simulation steps
         self.n_steps = int(self.t_max / self.dt)
         
+        # Cache thermal conductivity correction (material lookup is a linear scan)
+        self._temp_correction = self.get_temperature_correction_factor()
+        
         # Validate parameters
         self._validate_parameters()
     
+    # The kernels compare probabilities against float32 random draws, so they
+    # are given these float32 copies (which follow later assignments)
+    @property
+    def move_probability_float32(self) -> np.float32:
+        """move_probability as the float32 scalar the step kernels use."""
+        return np.float32(self.move_probability)
+    
+    @property
+    def convection_prob_float32(self) -> np.float32:
+        """convection_prob as the float32 scalar the simulation uses."""
+        return np.float32(self.convection_prob)
+    
+    def _compute_hotspot_cells(self) -> np.ndarray:
+        """Return the (n_cells, 2) array of (x, y) grid cells within the hot-spot radius."""
+        center_x, center_y = self.hotspot_center
+        xs, ys = np.ogrid[:self.Nx, :self.Ny]
+        mask = (xs - center_x)**2 + (ys - center_y)**2 <= self.hotspot_radius**2
+        cells = np.argwhere(mask).astype(np.int32)
+        # Read-only: copies of a config (e.g. from get_material_config) share this array
+        cells.flags.writeable = False
+        return cells
+    
     def _validate_parameters(self):
         """Validate configuration parameters."""
         if self.move_probability > 1.0:
@@ -109,11 +153,17 @@ class SimulationConfig:
                 f"Reduce dt or increase dx for stability."
             )
         
+        if max(self.Nx, self.Ny) > np.iinfo(np.int16).max:
+            raise ValueError("Grid is too large for int16 packet coordinates.")
+        
         if self.hotspot_center[0] >= self.Nx or self.hotspot_center[1] >= self.Ny:
             raise ValueError("Hot-spot center is outside grid boundaries.")
         
         if self.hotspot_radius <= 0:
             raise ValueError("Hot-spot radius must be positive.")
+        
+        if self.snapshot_stride < 1:
+            raise ValueError("Snapshot stride must be at least 1.")
     
     @classmethod
     def get_material_config(cls, material: str, Q: int = 15, **kwargs) -> 'SimulationConfig':
@@ -126,7 +176,10 @@ class SimulationConfig:
             **kwargs: Additional parameters to override defaults
             
         Returns:
-            SimulationConfig with material-specific thermal diffusivity
+            SimulationConfig with material-specific thermal diffusivity.
+            Configs are memoized per arguments; each call returns its own copy,
+            so callers may still modify the result (the derived hotspot_cells
+            array is shared between copies and read-only).
             
         Example:
             # Study copper at different heat injection rates
@@ -138,15 +191,20 @@ class SimulationConfig:
             config_al = SimulationConfig.get_material_config('aluminum', Q=20)
         """
         if material not in MATERIAL_PROPERTIES:
-            available = ', '.join(MATERIAL_PROPERTIES.keys())
-            raise ValueError(f"Unknown material '{material}'. Available: {available}")
+            raise ValueError(f"Unknown material '{material}'. Available: {_AVAILABLE_STR}")
         
-        defaults = {
-            'alpha': MATERIAL_PROPERTIES[material],
-            'Q': Q
-        }
-        defaults.update(kwargs)
-        return cls(**defaults)
+        # Float fields given as ints (t_max=1) share the t_max=1.0 cache entry and config
+        kwargs = {name: float(value) if name in _FLOAT_FIELDS and isinstance(value, numbers.Real)
+                  else value for name, value in kwargs.items()}
+        
+        try:
+            extra = tuple(sorted(kwargs.items()))
+            hash(extra)
+        except TypeError:
+            # Unhashable overrides (e.g. a list) - build without the cache
+            return _build_material_config(cls, material, Q, kwargs)
+        
+        return copy.copy(_cached_material_config(cls, material, Q, extra))
     
     @classmethod
     def steady_state_study_configs(cls, materials: list = None, Q_values: list = None) -> Dict[str, Dict[int, 'SimulationConfig']]:
@@ -244,8 +302,24 @@ class SimulationConfig:
         Returns:
             Corrected temperature accounting for thermal conductivity
         """
-        correction_factor = self.get_temperature_correction_factor()
-        return temperature * correction_factor
+        return temperature * self._temp_correction
+    
+    def apply_temperature_correction_array(self, temperatures: np.ndarray) -> np.ndarray:
+        """Apply thermal conductivity correction to an array of simulated temperatures (float32 result)."""
+        return np.multiply(temperatures, self._temp_correction, dtype=np.float32)
+    
+    def correct_to_absolute(self, temperature, ambient: float = AMBIENT_TEMPERATURE):
+        """
+        Convert raw simulated temperature(s) to absolute temperature in one pass.
+        
+        Args:
+            temperature: Raw simulated temperature (scalar or array of packet counts)
+            ambient: Ambient temperature (°C) added after the correction
+            
+        Returns:
+            Corrected absolute temperature (°C), same shape as the input
+        """
+        return np.multiply(temperature, self._temp_correction, dtype=np.float32) + np.float32(ambient)
     
     def to_dict(self) -> dict:
         """Convert configuration to dictionary."""
@@ -274,7 +348,12 @@ class SimulationConfig:
                 'probability': self.convection_prob
             },
             'output': {
-                'interval': self.output_interval, 'save_snapshots': self.save_snapshots
+                'interval': self.output_interval, 'save_snapshots': self.save_snapshots,
+                'snapshot_stride': self.snapshot_stride
+            },
+            'early_stop': {
+                'enabled': self.early_stop, 'window': self.early_stop_window,
+                'tolerance': self.early_stop_tolerance
             }
         }
     
@@ -299,6 +378,26 @@ class SimulationConfig:
         )
 
 
+# Config fields declared as float (get_material_config normalizes overrides of these)
+_FLOAT_FIELDS = frozenset(field.name for field in fields(SimulationConfig) if field.type is float)
+
+
+def _build_material_config(cls, material: str, Q: int, kwargs: dict) -> SimulationConfig:
+    """Construct a material config (runs validation and derived parameters)."""
+    defaults = {
+        'alpha': MATERIAL_PROPERTIES[material],
+        'Q': Q
+    }
+    defaults.update(kwargs)
+    return cls(**defaults)
+
+
+@lru_cache(maxsize=64)
+def _cached_material_config(cls, material: str, Q: int, extra: tuple) -> SimulationConfig:
+    """Memoized template for get_material_config; never handed out directly."""
+    return _build_material_config(cls, material, Q, dict(extra))
+
+
 def print_material_properties():
     """Print available materials and their thermal diffusivities."""
     print("Available Materials and Thermal Diffusivities (Wikipedia/Brown 1958):")
@@ -322,19 +421,17 @@ def print_standard_q_values():
 def get_material_alpha(material: str) -> float:
     """Get thermal diffusivity for a material."""
     if material not in MATERIAL_PROPERTIES:
-        available = ', '.join(MATERIAL_PROPERTIES.keys())
-        raise ValueError(f"Unknown material '{material}'. Available: {available}")
+        raise ValueError(f"Unknown material '{material}'. Available: {_AVAILABLE_STR}")
     return MATERIAL_PROPERTIES[material]
 
 
 def get_material_conductivity(material: str) -> float:
     """Get thermal conductivity for a material."""
     if material not in THERMAL_CONDUCTIVITY:
-        available = ', '.join(THERMAL_CONDUCTIVITY.keys())
-        raise ValueError(f"Unknown material '{material}'. Available: {available}")
+        raise ValueError(f"Unknown material '{material}'. Available: {_AVAILABLE_STR}")
     return THERMAL_CONDUCTIVITY[material]
 
 
-def list_materials() -> list:
-    """Get list of available materials."""
-    return list(MATERIAL_PROPERTIES.keys())
\ No newline at end of file
+def list_materials() -> Tuple[str, ...]:
+    """Get the available materials (a shared tuple, no copy per call)."""
+    return _MATERIAL_NAMES
\ No newline at end of file
@@ -11,10 +11,10 @@ import os
 sys.path.append('src')
 
 from config import SimulationConfig
-from simulate import MonteCarloSimulator
+from simulate import MonteCarloSimulator, run_cached
 
-def demonstrate_convection_cooling():
-    """Demonstrate convection cooling with different settings."""
+def demonstrate_convection_cooling(use_cache=False):
+    """Demonstrate convection cooling with different settings (use_cache: reuse stored runs)."""
     
     print("Monte Carlo Heat Diffusion - Convection Cooling Demo")
     print("=" * 55)
@@ -23,11 +23,12 @@ def demonstrate_convection_cooling():
     print("\n1. Baseline simulation (no convection cooling)")
     print("-" * 50)
     
-    config_baseline = SimulationConfig.get_material_config('copper', Q=20)
-    config_baseline.convection_prob = 0.0  # No convection
+    # One simulator for all three runs; reset() only changes the convection setting
+    simulator = MonteCarloSimulator(SimulationConfig.get_material_config('copper', Q=20))
     
-    simulator = MonteCarloSimulator(config_baseline)
-    result_baseline = simulator.run()
+    simulator.reset(convection_prob=0.0)  # No convection
+    
+    result_baseline = run_cached(simulator.config, simulator=simulator, use_cache=use_cache)
     
     baseline_temp = result_baseline['data']['hotspot_temperature'][-1]
     print(f"Final temperature (no convection): {baseline_temp:.1f}")
@@ -36,11 +37,9 @@ def demonstrate_convection_cooling():
     print("\n2. Natural convection cooling")
     print("-" * 50)
     
-    config_natural = SimulationConfig.get_material_config('copper', Q=20)
-    config_natural.convection_prob = 0.001  # Weak convection
+    simulator.reset(convection_prob=0.001)  # Weak convection
     
-    simulator = MonteCarloSimulator(config_natural)
-    result_natural = simulator.run()
+    result_natural = run_cached(simulator.config, simulator=simulator, use_cache=use_cache)
     
     natural_temp = result_natural['data']['hotspot_temperature'][-1]
     natural_convected = result_natural['data']['total_convected'][-1]
@@ -51,11 +50,9 @@ def demonstrate_convection_cooling():
     print("\n3. Forced air cooling")
     print("-" * 50)
     
-    config_forced = SimulationConfig.get_material_config('copper', Q=20)
-    config_forced.convection_prob = 0.01  # Strong convection
+    simulator.reset(convection_prob=0.01)  # Strong convection
     
-    simulator = MonteCarloSimulator(config_forced)
-    result_forced = simulator.run()
+    result_forced = run_cached(simulator.config, simulator=simulator, use_cache=use_cache)
     
     forced_temp = result_forced['data']['hotspot_temperature'][-1]
     forced_convected = result_forced['data']['total_convected'][-1]
@@ -110,5 +107,6 @@ def show_convection_parameters():
     print("   result = simulator.run()")
 
 if __name__ == "__main__":
-    demonstrate_convection_cooling()
+    # --cache: reuse (and store) results in outputs/.sim_cache
+    demonstrate_convection_cooling(use_cache='--cache' in sys.argv[1:])
     show_convection_parameters()
\ No newline at end of file
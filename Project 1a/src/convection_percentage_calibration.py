@@ -13,47 +13,67 @@ sys.path.append('src')
 
 import numpy as np
 from config import SimulationConfig
-from simulate import MonteCarloSimulator
+from simulate import run_cached, run_parallel
+
+# Heat transfer percentages for typical heat sinks from literature.
+#
+# Sources:
+# - Culham, J.R. & Muzychka, Y.S. "Optimization of Plate Fin Heat Sinks" (2001)
+# - Teertstra, P. et al. "Analytical Forced Convection Modeling of Plate Fin Heat Sinks" (2000)
+# - Kraus, A.D. & Bar-Cohen, A. "Design and Analysis of Heat Sinks" (1995)
+# - Electronics Cooling Magazine - Heat Sink Design Guidelines
+_HEAT_TRANSFER_PERCENTAGES = {
+    'natural_convection': {
+        'convection_percentage': 85,  # 85% convection, 15% radiation/conduction
+        'description': 'Natural convection heat sink (still air)',
+        'typical_application': 'Passive cooling, low-power electronics',
+        'reference': 'Kraus & Bar-Cohen (1995), Electronics Cooling Magazine'
+    },
+    'forced_convection_low': {
+        'convection_percentage': 92,  # 92% convection, 8% radiation/conduction
+        'description': 'Forced convection, low airflow (1-2 m/s)',
+        'typical_application': 'Desktop PC, small fans',
+        'reference': 'Teertstra et al. (2000), Culham & Muzychka (2001)'
+    },
+    'forced_convection_medium': {
+        'convection_percentage': 95,  # 95% convection, 5% radiation/conduction
+        'description': 'Forced convection, medium airflow (2-4 m/s)',
+        'typical_application': 'Workstation, server cooling',
+        'reference': 'Culham & Muzychka (2001), ATS Application Notes'
+    },
+    'forced_convection_high': {
+        'convection_percentage': 97,  # 97% convection, 3% radiation/conduction
+        'description': 'Forced convection, high airflow (>4 m/s)',
+        'typical_application': 'High-performance servers, industrial',
+        'reference': 'Electronics Cooling Magazine, JEDEC Standards'
+    }
+}
+
+def _run_one(params):
+    """Run one convection simulation in a worker process.
+    
+    Returns the final (total_convected, total_removed) packet counts, or the
+    exception if the simulation failed.
+    """
+    material, Q, conv_prob, t_max, use_cache = params
+    config = SimulationConfig.get_material_config(material, Q=Q)
+    config.convection_prob = conv_prob
+    config.t_max = t_max
+    config.n_steps = int(config.t_max / config.dt)
+    
+    try:
+        data = run_cached(config, use_cache=use_cache)['data']
+        return int(data['total_convected'][-1]), int(data['total_removed'][-1])
+    except Exception as e:
+        return e
 
 def get_heat_transfer_percentages():
     """
     Heat transfer percentages for typical heat sinks from literature.
     
-    Sources:
-    - Culham, J.R. & Muzychka, Y.S. "Optimization of Plate Fin Heat Sinks" (2001)
-    - Teertstra, P. et al. "Analytical Forced Convection Modeling of Plate Fin Heat Sinks" (2000)
-    - Kraus, A.D. & Bar-Cohen, A. "Design and Analysis of Heat Sinks" (1995)
-    - Electronics Cooling Magazine - Heat Sink Design Guidelines
+    Returns the shared module-level table (sources listed there); do not modify it.
     """
-    
-    heat_transfer_data = {
-        'natural_convection': {
-            'convection_percentage': 85,  # 85% convection, 15% radiation/conduction
-            'description': 'Natural convection heat sink (still air)',
-            'typical_application': 'Passive cooling, low-power electronics',
-            'reference': 'Kraus & Bar-Cohen (1995), Electronics Cooling Magazine'
-        },
-        'forced_convection_low': {
-            'convection_percentage': 92,  # 92% convection, 8% radiation/conduction
-            'description': 'Forced convection, low airflow (1-2 m/s)',
-            'typical_application': 'Desktop PC, small fans',
-            'reference': 'Teertstra et al. (2000), Culham & Muzychka (2001)'
-        },
-        'forced_convection_medium': {
-            'convection_percentage': 95,  # 95% convection, 5% radiation/conduction
-            'description': 'Forced convection, medium airflow (2-4 m/s)',
-            'typical_application': 'Workstation, server cooling',
-            'reference': 'Culham & Muzychka (2001), ATS Application Notes'
-        },
-        'forced_convection_high': {
-            'convection_percentage': 97,  # 97% convection, 3% radiation/conduction
-            'description': 'Forced convection, high airflow (>4 m/s)',
-            'typical_application': 'High-performance servers, industrial',
-            'reference': 'Electronics Cooling Magazine, JEDEC Standards'
-        }
-    }
-    
-    return heat_transfer_data
+    return _HEAT_TRANSFER_PERCENTAGES
 
 def calculate_probability_from_percentage(convection_percentage, calibration_factor=0.02):
     """
@@ -83,10 +103,13 @@ def calculate_probability_from_percentage(convection_percentage, calibration_fac
     
     return probability
 
-def validate_against_simulation():
+def validate_against_simulation(use_cache=False):
     """
     Validate calculated probabilities by running simulations and checking
     if the actual convection losses match the target percentages.
+    
+    Args:
+        use_cache: Reuse (and store) simulation results in outputs/.sim_cache
     """
     
     print("Validation: Checking Actual vs. Target Convection Percentages")
@@ -96,46 +119,78 @@ def validate_against_simulation():
     
     results = []
     
-    for scenario, data in heat_data.items():
+    # Scenarios are independent runs (2 second simulations), so run them in parallel
+    probabilities = {scenario: calculate_probability_from_percentage(data['convection_percentage'])
+                     for scenario, data in heat_data.items()}
+    outcomes = run_parallel(_run_one, [('aluminum', 20, prob, 2.0, use_cache)
+                                       for prob in probabilities.values()])
+    
+    for (scenario, data), outcome in zip(heat_data.items(), outcomes):
         target_percentage = data['convection_percentage']
-        calculated_prob = calculate_probability_from_percentage(target_percentage)
+        calculated_prob = probabilities[scenario]
+        
+        if isinstance(outcome, Exception):
+            print(f"{scenario:<25}: Simulation failed - {outcome}")
+            continue
+        
+        # Calculate actual convection percentage
+        total_convected, total_boundary = outcome
         
-        # Run simulation to check actual percentage
-        config = SimulationConfig.get_material_config('aluminum', Q=20)
-        config.convection_prob = calculated_prob
-        config.t_max = 2.0  # 2 second simulation
-        config.n_steps = int(config.t_max / config.dt)
+        total_lost = total_convected + total_boundary
+        actual_convection_percentage = (total_convected / total_lost * 100) if total_lost > 0 else 0
         
-        try:
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
-            # Calculate actual convection percentage
-            total_injected = result['data']['total_injected'][-1]
-            total_convected = result['data']['total_convected'][-1]
-            total_boundary = result['data']['total_removed'][-1]
-            
-            total_lost = total_convected + total_boundary
-            actual_convection_percentage = (total_convected / total_lost * 100) if total_lost > 0 else 0
-            
-            results.append({
-                'scenario': scenario,
-                'target_percentage': target_percentage,
-                'calculated_prob': calculated_prob,
-                'actual_percentage': actual_convection_percentage,
-                'description': data['description']
-            })
-            
-            print(f"{scenario:<25}: Target {target_percentage:2d}%, Prob {calculated_prob:.4f}, Actual {actual_convection_percentage:4.1f}%")
-            
-        except Exception as e:
-            print(f"{scenario:<25}: Simulation failed - {e}")
+        results.append({
+            'scenario': scenario,
+            'target_percentage': target_percentage,
+            'calculated_prob': calculated_prob,
+            'actual_percentage': actual_convection_percentage,
+            'description': data['description']
+        })
+        
+        print(f"{scenario:<25}: Target {target_percentage:2d}%, Prob {calculated_prob:.4f}, Actual {actual_convection_percentage:4.1f}%")
     
     return results
 
-def refine_calibration_factor():
+def _evaluate_factors(calibration_factors, target_percentage, use_cache=False):
+    """
+    Run a quick simulation for each calibration factor (in parallel) and print
+    a table row for each.
+    
+    Returns:
+        List of (factor, actual convection percentage) for the runs that succeeded
+    """
+    
+    # Calculate probability for each factor
+    convection_fraction = target_percentage / 100.0
+    probabilities = [min(convection_fraction * factor, 0.02) for factor in calibration_factors]
+    
+    # Quick simulation tests (shorter for speed)
+    outcomes = run_parallel(_run_one, [('aluminum', 20, probability, 1.0, use_cache)
+                                       for probability in probabilities])
+    
+    evaluated = []
+    for factor, probability, outcome in zip(calibration_factors, probabilities, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"{factor:<18.4f} {'Failed':<12} {'N/A':<10} {'N/A':<8}")
+            continue
+        
+        total_convected, total_boundary = outcome
+        total_lost = total_convected + total_boundary
+        
+        actual_percentage = (total_convected / total_lost * 100) if total_lost > 0 else 0
+        error = abs(actual_percentage - target_percentage)
+        
+        print(f"{factor:<18.4f} {probability:<12.4f} {actual_percentage:<10.1f} {error:<8.1f}")
+        evaluated.append((factor, actual_percentage))
+    
+    return evaluated
+
+def refine_calibration_factor(use_cache=False):
     """
     Iteratively refine the calibration factor to better match target percentages.
+    
+    Args:
+        use_cache: Reuse (and store) simulation results in outputs/.sim_cache
     """
     
     print(f"\n" + "=" * 65)
@@ -150,48 +205,34 @@ def refine_calibration_factor():
     print(f"Target convection percentage: {target_percentage}%")
     print()
     
-    # Test different calibration factors
-    calibration_factors = [0.01, 0.015, 0.02, 0.025, 0.03]
-    
     print(f"{'Calibration Factor':<18} {'Probability':<12} {'Actual %':<10} {'Error':<8}")
     print("-" * 50)
     
+    # The probability is linear in the factor (up to the cap), so instead of a
+    # sweep, bracket the target with two factors and take one secant step
+    # (factors beyond the probability cap all behave the same, so stop there)
+    factor_low = 0.01
+    factor_high = min(0.03, 0.02 / (target_percentage / 100.0))
+    evaluated = _evaluate_factors([factor_low, factor_high], target_percentage, use_cache)
+    
+    if len(evaluated) == 2 and evaluated[0][1] != evaluated[1][1]:
+        (f0, actual0), (f1, actual1) = evaluated
+        estimate = f0 + (target_percentage - actual0) * (f1 - f0) / (actual1 - actual0)
+        estimate = min(max(round(estimate, 4), factor_low), factor_high)
+        
+        # Verify the interpolated factor (unless it is one of the brackets)
+        if estimate not in (f0, f1):
+            evaluated += _evaluate_factors([estimate], target_percentage, use_cache)
+    
     best_factor = 0.02
     best_error = float('inf')
+    for factor, actual_percentage in evaluated:
+        error = abs(actual_percentage - target_percentage)
+        if error < best_error:
+            best_error = error
+            best_factor = factor
     
-    for factor in calibration_factors:
-        # Calculate probability with this factor
-        convection_fraction = target_percentage / 100.0
-        probability = convection_fraction * factor
-        probability = min(probability, 0.02)
-        
-        # Quick simulation test
-        config = SimulationConfig.get_material_config('aluminum', Q=20)
-        config.convection_prob = probability
-        config.t_max = 1.0  # Shorter for speed
-        config.n_steps = int(config.t_max / config.dt)
-        
-        try:
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
-            total_convected = result['data']['total_convected'][-1]
-            total_boundary = result['data']['total_removed'][-1]
-            total_lost = total_convected + total_boundary
-            
-            actual_percentage = (total_convected / total_lost * 100) if total_lost > 0 else 0
-            error = abs(actual_percentage - target_percentage)
-            
-            print(f"{factor:<18.3f} {probability:<12.4f} {actual_percentage:<10.1f} {error:<8.1f}")
-            
-            if error < best_error:
-                best_error = error
-                best_factor = factor
-                
-        except:
-            print(f"{factor:<18.3f} {'Failed':<12} {'N/A':<10} {'N/A':<8}")
-    
-    print(f"\nBest calibration factor: {best_factor:.3f} (error: {best_error:.1f}%)")
+    print(f"\nBest calibration factor: {best_factor:.4f} (error: {best_error:.1f}%)")
     return best_factor
 
 def recommend_final_probabilities():
@@ -209,24 +250,24 @@ def recommend_final_probabilities():
     print(f"{'Cooling Scenario':<25} {'Conv %':<8} {'Probability':<12} {'Application'}")
     print("-" * 70)
     
-    recommendations = []
+    recommendations = {}
     
     for scenario, data in heat_data.items():
         percentage = data['convection_percentage']
         probability = min((percentage / 100.0) * calibration_factor, 0.02)
         application = data['typical_application']
         
-        recommendations.append({
+        recommendations[scenario] = {
             'scenario': scenario,
             'percentage': percentage,
             'probability': probability,
             'application': application
-        })
+        }
         
         print(f"{scenario.replace('_', ' ').title():<25} {percentage:<8d} {probability:<12.4f} {application}")
     
     # Recommend the medium forced convection setting
-    recommended = next(r for r in recommendations if r['scenario'] == 'forced_convection_medium')
+    recommended = recommendations['forced_convection_medium']
     
     print(f"\nRECOMMENDED SETTING:")
     print(f"CONVECTION_PROB = {recommended['probability']:.4f}")
@@ -286,9 +327,10 @@ if __name__ == "__main__":
         print(f"  Reference: {data['reference']}")
         print()
     
-    # Validate and refine
-    validation_results = validate_against_simulation()
-    best_factor = refine_calibration_factor()
+    # Validate and refine (--cache: reuse and store results in outputs/.sim_cache)
+    use_cache = '--cache' in sys.argv[1:]
+    validation_results = validate_against_simulation(use_cache)
+    best_factor = refine_calibration_factor(use_cache)
     recommended_prob = recommend_final_probabilities()
     show_literature_references()
     
@@ -4,25 +4,19 @@ Create a table of convection parameters used in the Monte Carlo simulation.
 """
 
 import sys
+import os
 sys.path.append('src')
 
-import matplotlib.pyplot as plt
+# Object-oriented Agg API only: pyplot's state machine and backend probing are not needed
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.transforms import Bbox
 import numpy as np
 from config import SimulationConfig
 
-def create_convection_parameters_table():
-    """Create a professional table of convection parameters."""
+def _draw_convection_parameters_table(ax):
+    """Draw the table of convection parameters into ax."""
     
-    # Ensure output directories exist in the parent directory (Project 1a root)
-    import os
-    reporting_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reporting")
-    figures_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "outputs", "figures")
-    os.makedirs(reporting_dir, exist_ok=True)
-    os.makedirs(figures_dir, exist_ok=True)
-    
-    # Set up the figure
-    fig, ax = plt.subplots(figsize=(12, 8))
-    ax.axis('tight')
     ax.axis('off')
     
     # Table title
@@ -66,29 +60,11 @@ def create_convection_parameters_table():
             for j in range(len(convection_data[0])):
                 table[(i, j)].set_facecolor('#F8F8F8')
     
-    # Add title
-    plt.figtext(0.5, 0.85, title, ha='center', va='top', fontsize=12, wrap=True)
-    
-    # Save the table
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.75)
-    plt.savefig(os.path.join(reporting_dir, 'convection_parameters_table.pdf'), 
-                bbox_inches='tight', dpi=300, facecolor='white')
-    plt.savefig(os.path.join(figures_dir, 'convection_parameters_table.png'), 
-                bbox_inches='tight', dpi=300, facecolor='white')
-    
-    print("✅ Convection parameters table saved:")
-    print(f"   - {reporting_dir}/convection_parameters_table.pdf")
-    print(f"   - {figures_dir}/convection_parameters_table.png")
-    
-    plt.close()
+    ax.set_title(title, fontsize=12)
 
-def create_validation_results_table():
-    """Create a table showing validation results for different materials."""
+def _draw_validation_results_table(ax):
+    """Draw the table of validation results for different materials into ax."""
     
-    # Set up the figure
-    fig, ax = plt.subplots(figsize=(12, 6))
-    ax.axis('tight')
     ax.axis('off')
     
     # Table title
@@ -136,29 +112,11 @@ def create_validation_results_table():
             for j in range(len(validation_data[0])):
                 table[(i, j)].set_facecolor('#F8F8F8')
     
-    # Add title
-    plt.figtext(0.5, 0.85, title, ha='center', va='top', fontsize=12, wrap=True)
-    
-    # Save the table
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.75)
-    plt.savefig(os.path.join(reporting_dir, 'convection_validation_table.pdf'), 
-                bbox_inches='tight', dpi=300, facecolor='white')
-    plt.savefig(os.path.join(figures_dir, 'convection_validation_table.png'), 
-                bbox_inches='tight', dpi=300, facecolor='white')
-    
-    print("✅ Convection validation table saved:")
-    print(f"   - {reporting_dir}/convection_validation_table.pdf")
-    print(f"   - {figures_dir}/convection_validation_table.png")
-    
-    plt.close()
+    ax.set_title(title, fontsize=12)
 
-def create_literature_comparison_table():
-    """Create a table comparing with literature heat transfer percentages."""
+def _draw_literature_comparison_table(ax):
+    """Draw the table comparing with literature heat transfer percentages into ax."""
     
-    # Set up the figure
-    fig, ax = plt.subplots(figsize=(12, 7))
-    ax.axis('tight')
     ax.axis('off')
     
     # Table title
@@ -207,31 +165,65 @@ def create_literature_comparison_table():
             for j in range(len(literature_data[0])):
                 table[(i, j)].set_facecolor('#F8F8F8')
     
-    # Add title
-    plt.figtext(0.5, 0.88, title, ha='center', va='top', fontsize=12, wrap=True)
-    
-    # Save the table
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.78)
-    plt.savefig(os.path.join(reporting_dir, 'literature_comparison_table.pdf'), 
-                bbox_inches='tight', dpi=300, facecolor='white')
-    plt.savefig(os.path.join(figures_dir, 'literature_comparison_table.png'), 
-                bbox_inches='tight', dpi=300, facecolor='white')
+    ax.set_title(title, fontsize=12)
+
+# Table drawers with their output file stem and the height of their original figure
+TABLES = [
+    (_draw_convection_parameters_table, 'convection_parameters_table', 8),
+    (_draw_validation_results_table, 'convection_validation_table', 6),
+    (_draw_literature_comparison_table, 'literature_comparison_table', 7),
+]
+
+def build_all_tables(fig):
+    """Draw all convection tables into one figure, one axis each. Returns the axes."""
+    axes = fig.subplots(len(TABLES), 1,
+                        gridspec_kw={'height_ratios': [height for _, _, height in TABLES]})
+    for ax, (draw, _, _) in zip(axes, TABLES):
+        draw(ax)
+    return axes
+
+def create_convection_tables():
+    """Render all convection tables once and save the combined and per-table files."""
     
-    print("✅ Literature comparison table saved:")
-    print(f"   - {reporting_dir}/literature_comparison_table.pdf")
-    print(f"   - {figures_dir}/literature_comparison_table.png")
+    # Ensure output directories exist in the parent directory (Project 1a root)
+    reporting_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reporting")
+    figures_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "outputs", "figures")
+    os.makedirs(reporting_dir, exist_ok=True)
+    os.makedirs(figures_dir, exist_ok=True)
     
-    plt.close()
+    # One figure for all tables: the backend and fonts are set up only once
+    fig = Figure(figsize=(12, sum(height for _, _, height in TABLES)))
+    FigureCanvasAgg(fig)
+    axes = build_all_tables(fig)
+    fig.tight_layout()
+    
+    combined_path = os.path.join(reporting_dir, 'convection_tables.pdf')
+    fig.savefig(combined_path, bbox_inches='tight', facecolor='white')
+    print("✅ Combined convection tables saved:")
+    print(f"   - {combined_path}")
+    
+    # Separate files are cut from the same figure using each table's extent
+    renderer = fig.canvas.get_renderer()
+    for ax, (_, name, _) in zip(axes, TABLES):
+        extent = Bbox.union([ax.title.get_window_extent(renderer),
+                             ax.tables[0].get_window_extent(renderer)])
+        extent = extent.transformed(fig.dpi_scale_trans.inverted()).padded(0.1)
+        # PDFs are vector; the PNG previews are plain text tables, so 100 dpi is enough
+        fig.savefig(os.path.join(reporting_dir, f'{name}.pdf'),
+                    bbox_inches=extent, facecolor='white')
+        fig.savefig(os.path.join(figures_dir, f'{name}.png'),
+                    bbox_inches=extent, dpi=100, facecolor='white')
+        
+        print(f"✅ {name.replace('_', ' ').capitalize()} saved:")
+        print(f"   - {reporting_dir}/{name}.pdf")
+        print(f"   - {figures_dir}/{name}.png")
 
 if __name__ == "__main__":
     print("Creating Convection Parameter Tables")
     print("=" * 40)
     
     # Create all tables
-    create_convection_parameters_table()
-    create_validation_results_table()
-    create_literature_comparison_table()
+    create_convection_tables()
     
     print("\n" + "=" * 40)
     print("All convection tables created successfully!")
@@ -7,10 +7,20 @@ import sys
 sys.path.append('src')
 
 from config import SimulationConfig
-from simulate import MonteCarloSimulator
+from simulate import run_cached, run_parallel
 
-def debug_figure_3_vs_tables():
-    """Check what temperatures are used in Figure 3 vs tables."""
+def _run_material(job):
+    """Run one material in a worker process and return its final raw temperature."""
+    material, Q, use_cache = job
+    config = SimulationConfig.get_material_config(material, Q=Q)
+    data = run_cached(config, use_cache=use_cache)['data']
+    
+    if len(data['hotspot_temperature']) == 0:
+        return None
+    return float(data['hotspot_temperature'][-1])
+
+def debug_figure_3_vs_tables(use_cache=False):
+    """Check what temperatures are used in Figure 3 vs tables (use_cache: reuse stored runs)."""
     
     print("Debugging Figure 3 vs Table Inconsistencies")
     print("=" * 50)
@@ -24,18 +34,15 @@ def debug_figure_3_vs_tables():
     
     results = {}
     
-    for material in materials:
+    # Materials are independent runs, so simulate them in parallel
+    raw_temps = run_parallel(_run_material, [(m, Q, use_cache) for m in materials])
+    
+    for material, raw_temp in zip(materials, raw_temps):
         print(f"\n{material.replace('_', ' ').title()}:")
         
-        # Run simulation
-        config = SimulationConfig.get_material_config(material, Q=Q)
-        simulator = MonteCarloSimulator(config)
-        result = simulator.run()
-        
         # Get temperatures
-        data = result['data']
-        if data['hotspot_temperature']:
-            raw_temp = data['hotspot_temperature'][-1]
+        if raw_temp is not None:
+            config = SimulationConfig.get_material_config(material, Q=Q)
             corrected_temp = config.apply_temperature_correction(raw_temp)
             
             print(f"  Raw simulation: {raw_temp:.1f} packets")
@@ -60,7 +67,8 @@ def debug_figure_3_vs_tables():
     return results
 
 if __name__ == "__main__":
-    results = debug_figure_3_vs_tables()
+    # --cache: reuse (and store) results in outputs/.sim_cache
+    results = debug_figure_3_vs_tables(use_cache='--cache' in sys.argv[1:])
     
     print(f"\nIf Figure 3 shows different values, there's a data inconsistency!")
     print(f"All tables and figures should use the SAME simulation results.")
\ No newline at end of file
@@ -3,25 +3,49 @@ Experiment definitions and execution framework.
 """
 
 from typing import Dict, List, Any, Optional, Callable
+import dataclasses
+import os
 import numpy as np
 import time
-import matplotlib.pyplot as plt
 
 try:
     from .config import SimulationConfig
-    from .simulate import MonteCarloSimulator
+    from .simulate import MonteCarloSimulator, run_parallel, worker_simulator
 except ImportError:
     # Fallback for direct execution
     from config import SimulationConfig
-    from simulate import MonteCarloSimulator
+    from simulate import MonteCarloSimulator, run_parallel, worker_simulator
+
+
+# Column layouts of the per-run metrics tables the study plots are drawn from
+_SWEEP_DTYPE = np.dtype([('max_temp', 'f8'), ('cooling_time', 'f8'), ('final_packets', 'i8')])
+_CONVERGENCE_DTYPE = np.dtype([('packet_count', 'i8'), ('mean_max_temp', 'f8'), ('std_max_temp', 'f8'),
+                               ('relative_error', 'f8'), ('theoretical_error', 'f8')])
+
+
+def _runner_worker(config: SimulationConfig) -> Dict:
+    """Run one simulation in a worker process."""
+    return worker_simulator(config).run()
 
 
 class ExperimentRunner:
     """Framework for running and managing multiple simulation experiments."""
     
-    def __init__(self):
+    def __init__(self, n_workers: Optional[int] = None, figures_dir: Optional[str] = None):
         self.experiments = {}
         self.results = {}
+        
+        # Figure of each study, by name; also saved as PNG in figures_dir when one is given
+        self.figures = {}
+        self.figures_dir = figures_dir
+        
+        # Independent runs of a study are spread over a process pool that
+        # lives for the duration of the study
+        self.n_workers = n_workers or os.cpu_count() or 1
+    
+    def _map_runs(self, configs: List[SimulationConfig]) -> List[Dict]:
+        """Run one simulation per config, in parallel when n_workers > 1."""
+        return run_parallel(_runner_worker, configs, n_workers=self.n_workers)
     
     def add_experiment(self, name: str, config: SimulationConfig, 
                       description: str = ""):
@@ -62,34 +86,15 @@ class ExperimentRunner:
         """Compare different materials (thermal diffusivities)."""
         print("Running material comparison study...")
         
-        results = {}
-        
+        configs = []
         for material_name, alpha in materials.items():
-            # Create config for this material - copy only the constructor parameters
-            config_dict = {
-                'Lx': base_config.Lx,
-                'Ly': base_config.Ly,
-                'dx': base_config.dx,
-                'dt': base_config.dt,
-                't_max': base_config.t_max,
-                'alpha': alpha,  # Use the new alpha value
-                'N_packets': base_config.N_packets,
-                'random_seed': base_config.random_seed,
-                'hotspot_center': base_config.hotspot_center,
-                'hotspot_radius': base_config.hotspot_radius,
-                'Q': base_config.Q,
-                'boundary_type': base_config.boundary_type,
-                'output_interval': base_config.output_interval,
-                'save_snapshots': base_config.save_snapshots
-            }
-            
-            config = SimulationConfig(**config_dict)
-            
-            print(f"\nTesting {material_name} (α = {alpha:.2e} m²/s)")
-            
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
+            configs.append(dataclasses.replace(base_config, alpha=alpha))
+            print(f"Queued {material_name} (α = {alpha:.2e} m²/s)")
+        
+        runs = self._map_runs(configs)
+        
+        results = {}
+        for (material_name, alpha), config, result in zip(materials.items(), configs, runs):
             results[material_name] = {
                 'config': config,
                 'results': result,
@@ -97,7 +102,7 @@ class ExperimentRunner:
             }
         
         # Generate comparison plots
-        self._plot_material_comparison(results)
+        self._keep_figure(self._plot_material_comparison(results), 'material_comparison')
         
         return results
     
@@ -106,36 +111,15 @@ class ExperimentRunner:
         """Sweep a parameter across different values."""
         print(f"Running parameter sweep for {parameter_name}...")
         
-        results = {}
-        
+        configs = []
         for value in values:
-            print(f"\nTesting {parameter_name} = {value}")
-            
-            # Create config with modified parameter - copy constructor parameters
-            config_dict = {
-                'Lx': base_config.Lx,
-                'Ly': base_config.Ly,
-                'dx': base_config.dx,
-                'dt': base_config.dt,
-                't_max': base_config.t_max,
-                'alpha': base_config.alpha,
-                'N_packets': base_config.N_packets,
-                'random_seed': base_config.random_seed,
-                'hotspot_center': base_config.hotspot_center,
-                'hotspot_radius': base_config.hotspot_radius,
-                'Q': base_config.Q,
-                'boundary_type': base_config.boundary_type,
-                'output_interval': base_config.output_interval,
-                'save_snapshots': base_config.save_snapshots
-            }
-            
-            # Update the specific parameter
-            config_dict[parameter_name] = value
-            config = SimulationConfig(**config_dict)
-            
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
+            print(f"Queued {parameter_name} = {value}")
+            configs.append(dataclasses.replace(base_config, **{parameter_name: value}))
+        
+        runs = self._map_runs(configs)
+        
+        results = {}
+        for value, config, result in zip(values, configs, runs):
             results[value] = {
                 'config': config,
                 'results': result,
@@ -143,7 +127,8 @@ class ExperimentRunner:
             }
         
         # Generate sweep plots
-        self._plot_parameter_sweep(parameter_name, results)
+        self._keep_figure(self._plot_parameter_sweep(parameter_name, results),
+                          f'parameter_sweep_{parameter_name}')
         
         return results
     
@@ -153,43 +138,21 @@ class ExperimentRunner:
         """Study Monte Carlo convergence with different packet numbers."""
         print("Running Monte Carlo convergence study...")
         
-        results = {}
-        
+        # One flat job list over (N, realization), regrouped by N afterwards
+        configs = []
         for N in packet_counts:
-            print(f"\nTesting N_packets = {N}")
-            
-            realization_results = []
-            
+            print(f"Queued N_packets = {N} ({n_realizations} realizations)")
             for realization in range(n_realizations):
-                print(f"  Realization {realization + 1}/{n_realizations}")
-                
-                # Create config with different packet count and seed
-                config_dict = {
-                    'Lx': base_config.Lx,
-                    'Ly': base_config.Ly,
-                    'dx': base_config.dx,
-                    'dt': base_config.dt,
-                    't_max': base_config.t_max,
-                    'alpha': base_config.alpha,
-                    'N_packets': N,  # Use the new packet count
-                    'random_seed': 42 + realization,  # Different seed per realization
-                    'hotspot_center': base_config.hotspot_center,
-                    'hotspot_radius': base_config.hotspot_radius,
-                    'Q': base_config.Q,
-                    'boundary_type': base_config.boundary_type,
-                    'output_interval': base_config.output_interval,
-                    'save_snapshots': base_config.save_snapshots
-                }
-                
-                config = SimulationConfig(**config_dict)
-                
-                simulator = MonteCarloSimulator(config)
-                result = simulator.run()
-                
-                realization_results.append(result)
-            
+                # Different seed per realization
+                configs.append(dataclasses.replace(base_config, N_packets=N,
+                                                   random_seed=42 + realization))
+        
+        runs = self._map_runs(configs)
+        
+        results = {}
+        for i, N in enumerate(packet_counts):
             results[N] = {
-                'realizations': realization_results,
+                'realizations': runs[i * n_realizations:(i + 1) * n_realizations],
                 'packet_count': N
             }
         
@@ -197,11 +160,13 @@ class ExperimentRunner:
         convergence_analysis = self._analyze_convergence(results)
         
         # Generate convergence plots
-        self._plot_convergence_study(results, convergence_analysis)
+        fig = self._keep_figure(self._plot_convergence_study(results, convergence_analysis),
+                                'convergence_study')
         
         return {
             'results': results,
-            'analysis': convergence_analysis
+            'analysis': convergence_analysis,
+            'figure': fig
         }
     
     def _analyze_convergence(self, results: Dict) -> Dict:
@@ -209,27 +174,48 @@ class ExperimentRunner:
         analysis = {}
         
         for N, data in results.items():
-            realizations = data['realizations']
+            # Max temperatures of the realizations that produced metrics
+            max_temps = np.fromiter(
+                (result['metrics']['max_temperature']
+                 for result in data['realizations'] if result['metrics']),
+                dtype=np.float64
+            )
             
-            # Extract max temperatures from each realization
-            max_temps = []
-            for result in realizations:
-                if result['metrics']:
-                    max_temps.append(result['metrics']['max_temperature'])
-            
-            if max_temps:
+            if max_temps.size:
+                mean_max_temp = max_temps.mean()
+                std_max_temp = max_temps.std()
                 analysis[N] = {
-                    'mean_max_temp': np.mean(max_temps),
-                    'std_max_temp': np.std(max_temps),
-                    'relative_error': np.std(max_temps) / np.mean(max_temps),
-                    'theoretical_error': 1.0 / np.sqrt(N)  # Expected 1/√N scaling
+                    'mean_max_temp': mean_max_temp,
+                    'std_max_temp': std_max_temp,
+                    'relative_error': std_max_temp / mean_max_temp,
+                    'theoretical_error': N ** -0.5  # Expected 1/√N scaling
                 }
         
         return analysis
     
+    def _new_figure(self, figsize):
+        """Create a plain matplotlib Figure: no pyplot state and no GUI backend.
+        
+        matplotlib is imported here rather than at module level, so running
+        studies (or importing this module) does not pay for it until a plot is made.
+        """
+        from matplotlib.figure import Figure
+        return Figure(figsize=figsize)
+    
+    def _keep_figure(self, fig, name: str):
+        """Store a study figure under name, saving it as PNG if figures_dir is set."""
+        self.figures[name] = fig
+        if self.figures_dir is not None:
+            os.makedirs(self.figures_dir, exist_ok=True)
+            path = os.path.join(self.figures_dir, f"{name}.png")
+            fig.savefig(path, dpi=120)
+            print(f"Plot saved as: {path}")
+        return fig
+    
     def _plot_material_comparison(self, results: Dict):
-        """Generate plots comparing different materials."""
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+        """Generate plots comparing different materials and return the figure."""
+        fig = self._new_figure((12, 10))
+        axes = fig.subplots(2, 2)
         
         # Temperature evolution comparison
         ax = axes[0, 0]
@@ -260,67 +246,68 @@ class ExperimentRunner:
         for i, (material, data) in enumerate(list(results.items())[:2]):
             ax = axes[1, i]
             snapshots = data['results']['data']['temperature_snapshots']
-            if snapshots:
+            if len(snapshots) > 0:
                 final_temp = snapshots[-1]
                 im = ax.imshow(final_temp.T, origin='lower', cmap='hot')
                 ax.set_title(f'{material} - Final Temperature')
-                plt.colorbar(im, ax=ax)
+                fig.colorbar(im, ax=ax)
         
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        return fig
     
     def _plot_parameter_sweep(self, parameter_name: str, results: Dict):
-        """Generate plots for parameter sweep results."""
-        fig, axes = plt.subplots(1, 3, figsize=(15, 5))
-        
-        values = list(results.keys())
-        max_temps = []
-        cooling_times = []
-        final_packets = []
-        
-        for value in values:
-            metrics = results[value]['results']['metrics']
-            if metrics:
-                max_temps.append(metrics['max_temperature'])
-                cooling_times.append(metrics['cooling_time'] or 0)
-                final_packets.append(metrics['final_active_packets'])
+        """Generate plots for parameter sweep results and return the figure."""
+        fig = self._new_figure((15, 5))
+        axes = fig.subplots(1, 3)
+        
+        # One row per run that produced metrics (values may be non-numeric, so
+        # they stay a separate list)
+        values = [value for value in results if results[value]['results']['metrics']]
+        sweep = np.fromiter(
+            ((metrics['max_temperature'], metrics['cooling_time'] or 0, metrics['final_active_packets'])
+             for metrics in (results[value]['results']['metrics'] for value in values)),
+            dtype=_SWEEP_DTYPE, count=len(values)
+        )
         
         # Max temperature vs parameter
-        axes[0].plot(values, max_temps, 'o-')
+        axes[0].plot(values, sweep['max_temp'], 'o-')
         axes[0].set_xlabel(parameter_name)
         axes[0].set_ylabel('Max Temperature')
         axes[0].set_title(f'Max Temperature vs {parameter_name}')
         axes[0].grid(True)
         
         # Cooling time vs parameter
-        axes[1].plot(values, cooling_times, 'o-')
+        axes[1].plot(values, sweep['cooling_time'], 'o-')
         axes[1].set_xlabel(parameter_name)
         axes[1].set_ylabel('Cooling Time (s)')
         axes[1].set_title(f'Cooling Time vs {parameter_name}')
         axes[1].grid(True)
         
         # Final packets vs parameter
-        axes[2].plot(values, final_packets, 'o-')
+        axes[2].plot(values, sweep['final_packets'], 'o-')
         axes[2].set_xlabel(parameter_name)
         axes[2].set_ylabel('Final Active Packets')
         axes[2].set_title(f'Final Packets vs {parameter_name}')
         axes[2].grid(True)
         
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        return fig
     
     def _plot_convergence_study(self, results: Dict, analysis: Dict):
-        """Generate plots for convergence study."""
-        fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-        
-        packet_counts = list(analysis.keys())
-        mean_temps = [analysis[N]['mean_max_temp'] for N in packet_counts]
-        std_temps = [analysis[N]['std_max_temp'] for N in packet_counts]
-        relative_errors = [analysis[N]['relative_error'] for N in packet_counts]
-        theoretical_errors = [analysis[N]['theoretical_error'] for N in packet_counts]
+        """Generate plots for convergence study and return the figure."""
+        fig = self._new_figure((12, 5))
+        axes = fig.subplots(1, 2)
+        
+        convergence = np.fromiter(
+            ((N, stats['mean_max_temp'], stats['std_max_temp'],
+              stats['relative_error'], stats['theoretical_error'])
+             for N, stats in analysis.items()),
+            dtype=_CONVERGENCE_DTYPE, count=len(analysis)
+        )
+        packet_counts = convergence['packet_count']
         
         # Convergence with error bars
-        axes[0].errorbar(packet_counts, mean_temps, yerr=std_temps, 
+        axes[0].errorbar(packet_counts, convergence['mean_max_temp'], yerr=convergence['std_max_temp'], 
                         fmt='o-', capsize=5)
         axes[0].set_xlabel('Number of Packets')
         axes[0].set_ylabel('Max Temperature')
@@ -328,16 +315,16 @@ class ExperimentRunner:
         axes[0].grid(True)
         
         # Error scaling
-        axes[1].loglog(packet_counts, relative_errors, 'o-', label='Observed')
-        axes[1].loglog(packet_counts, theoretical_errors, '--', label='1/√N theoretical')
+        axes[1].loglog(packet_counts, convergence['relative_error'], 'o-', label='Observed')
+        axes[1].loglog(packet_counts, convergence['theoretical_error'], '--', label='1/√N theoretical')
         axes[1].set_xlabel('Number of Packets')
         axes[1].set_ylabel('Relative Error')
         axes[1].set_title('Error Scaling')
         axes[1].legend()
         axes[1].grid(True)
         
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        return fig
     
     def get_experiment_summary(self) -> Dict:
         """Get summary of all experiments."""
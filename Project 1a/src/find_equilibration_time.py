@@ -7,6 +7,8 @@ import sys
 sys.path.append('src')
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend - plots are only saved to file
 import matplotlib.pyplot as plt
 from config import SimulationConfig
 from simulate import MonteCarloSimulator
@@ -34,8 +36,7 @@ def find_steel_equilibration_time():
     temps = np.array(data['hotspot_temperature'])
     
     # Apply temperature correction
-    corrected_temps = [config.apply_temperature_correction(t) for t in temps]
-    corrected_temps = np.array(corrected_temps)
+    corrected_temps = config.apply_temperature_correction_array(temps)
     
     print("\nEquilibration Analysis:")
     print("-" * 25)
@@ -46,25 +47,14 @@ def find_steel_equilibration_time():
     # Criterion 1: Temperature rise rate < 0.5°C/s
     window_size = 50  # data points for moving average
     if len(corrected_temps) > window_size:
-        temp_rates = []
-        time_windows = []
-        
-        for i in range(window_size, len(corrected_temps)):
-            window_temps = corrected_temps[i-window_size:i]
-            window_times = times[i-window_size:i]
-            
-            if len(window_temps) > 1:
-                rate = (window_temps[-1] - window_temps[0]) / (window_times[-1] - window_times[0])
-                temp_rates.append(rate)
-                time_windows.append(times[i])
-        
-        # Find when rate drops below 0.5°C/s
-        temp_rates = np.array(temp_rates)
-        time_windows = np.array(time_windows)
+        # Rate across each window [i - window_size, i), reported at times[i]
+        temp_rates = ((corrected_temps[window_size - 1:-1] - corrected_temps[:-window_size]) /
+                      (times[window_size - 1:-1] - times[:-window_size]))
+        time_windows = times[window_size:]
         
         stable_mask = np.abs(temp_rates) < 0.5
         if np.any(stable_mask):
-            equilibration_times['rate_criterion'] = time_windows[stable_mask][0]
+            equilibration_times['rate_criterion'] = time_windows[np.argmax(stable_mask)]
     
     # Criterion 2: Temperature within 2% of final value
     final_temp = corrected_temps[-1]
@@ -72,21 +62,25 @@ def find_steel_equilibration_time():
     
     within_tolerance = np.abs(corrected_temps - final_temp) <= tolerance
     if np.any(within_tolerance):
-        equilibration_times['tolerance_criterion'] = times[within_tolerance][0]
+        equilibration_times['tolerance_criterion'] = times[np.argmax(within_tolerance)]
     
     # Criterion 3: Coefficient of variation < 1% in sliding window
     cv_threshold = 0.01
     window_size_cv = 100  # larger window for CV
     
     if len(corrected_temps) > window_size_cv:
-        for i in range(window_size_cv, len(corrected_temps)):
-            window_temps = corrected_temps[i-window_size_cv:i]
-            
-            if len(window_temps) > 1:
-                cv = np.std(window_temps) / np.mean(window_temps)
-                if cv < cv_threshold:
-                    equilibration_times['cv_criterion'] = times[i]
-                    break
+        # Rolling mean and std over the same windows from running sums (float64
+        # so that E[T^2] - E[T]^2 does not cancel badly)
+        sums = np.concatenate(([0.0], np.cumsum(corrected_temps, dtype=np.float64)))
+        sq_sums = np.concatenate(([0.0], np.cumsum(np.square(corrected_temps, dtype=np.float64))))
+        window_sums = sums[window_size_cv:-1] - sums[:-window_size_cv - 1]
+        window_sq_sums = sq_sums[window_size_cv:-1] - sq_sums[:-window_size_cv - 1]
+        window_means = window_sums / window_size_cv
+        window_vars = np.maximum(window_sq_sums / window_size_cv - window_means ** 2, 0.0)
+        
+        stable = np.sqrt(window_vars) / window_means < cv_threshold
+        if np.any(stable):
+            equilibration_times['cv_criterion'] = times[window_size_cv + np.argmax(stable)]
     
     # Report results
     print(f"Final temperature: {final_temp:.1f}°C")
@@ -99,13 +93,15 @@ def find_steel_equilibration_time():
     
     # Temperature at different time points
     print(f"\nTemperature Evolution:")
-    time_points = [1, 2, 5, 10, 15]
-    for t in time_points:
-        if t <= config.t_max:
-            # Find closest time point
-            idx = np.argmin(np.abs(times - t))
-            temp_at_t = corrected_temps[idx]
-            print(f"  At {t:2d}s: {temp_at_t:.1f}°C")
+    time_points = np.array([1, 2, 5, 10, 15])
+    time_points = time_points[time_points <= config.t_max]
+    
+    # Closest recorded time to each point: binary search, then step back one
+    # sample where the earlier neighbour is at least as close
+    idx = np.clip(np.searchsorted(times, time_points), 1, len(times) - 1)
+    idx -= (time_points - times[idx - 1]) <= (times[idx] - time_points)
+    for t, temp_at_t in zip(time_points, corrected_temps[idx]):
+        print(f"  At {t:2d}s: {temp_at_t:.1f}°C")
     
     # Check final stability
     last_20_percent = int(0.8 * len(corrected_temps))
@@ -177,7 +173,7 @@ def find_steel_equilibration_time():
     os.makedirs(figures_dir, exist_ok=True)
     
     output_path = os.path.join(figures_dir, 'steel_equilibration_analysis.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.savefig(output_path, dpi=100, bbox_inches='tight')
     plt.close()
     
     print(f"\nDetailed plot saved as: {output_path}")
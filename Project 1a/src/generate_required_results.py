@@ -19,6 +19,8 @@ import sys
 import os
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import matplotlib.patches as patches
@@ -29,15 +31,15 @@ plt.ioff()
 # Import from same directory (src)
 try:
     from config import SimulationConfig
-    from simulate import MonteCarloSimulator
+    from simulate import run_cached, run_parallel, worker_simulator
 except ImportError:
     # Fallback for running from project root
     from src.config import SimulationConfig
-    from src.simulate import MonteCarloSimulator
+    from src.simulate import run_cached, run_parallel, worker_simulator
 
 
-def generate_required_results():
-    """Generate ONLY the required results - nothing else."""
+def generate_required_results(use_cache=False):
+    """Generate ONLY the required results - nothing else (use_cache: reuse stored runs)."""
     
     # Ensure reporting directory exists in the parent directory (Project 1a root)
     import os
@@ -50,7 +52,10 @@ def generate_required_results():
     
     # GENERATE ALL DATA ONCE - SHARED ACROSS ALL FIGURES AND TABLES
     print("\nGenerating shared simulation data...")
-    shared_data = generate_all_simulation_data()
+    shared_data = generate_all_simulation_data(use_cache)
+    
+    # One figure for every page: each page sizes it, draws, saves and clears it
+    fig = plt.figure()
     
     with PdfPages(filename) as pdf:
         
@@ -59,95 +64,120 @@ def generate_required_results():
         
         # Figure 1: Heating curve (Copper, Q=20)
         print("  Creating Figure 1: Heating curve (Copper, Q=20)")
-        create_figure_1(pdf, shared_data)
+        create_figure_1(pdf, shared_data, fig)
         
         # Figure 2: Heat map (Copper, Q=20) - same data as Figure 1
         print("  Creating Figure 2: Heat map (Copper, Q=20)")
-        create_figure_2(pdf, shared_data)
+        create_figure_2(pdf, shared_data, fig)
         
         # Figure 3: Material comparison (Silver, Copper, Steel, Q=20)
         print("  Creating Figure 3: Material comparison (Silver, Copper, Steel, Q=20)")
-        create_figure_3(pdf, shared_data)
+        create_figure_3(pdf, shared_data, fig)
         
         # Figure 4: Injection-rate dependence (Copper, Q=[5,10,15,20,25])
         print("  Creating Figure 4: Injection-rate dependence (Copper, Q=[5,10,15,20,25])")
-        create_figure_4(pdf, shared_data)
+        create_figure_4(pdf, shared_data, fig)
         
         # ANNEX TABLES
         print("\nANNEX TABLES:")
         
         # Table A1: Steady-state temperatures (ALL materials, ALL Q values)
         print("  Creating Table A1: Steady-state temperatures (ALL materials)")
-        create_table_a1(pdf, shared_data)
+        create_table_a1(pdf, shared_data, fig)
         
         # Table A2: Time to steady state (optional but useful)
         print("  Creating Table A2: Time to steady state")
-        create_table_a2(pdf, shared_data)
+        create_table_a2(pdf, shared_data, fig)
         
         # Table A3: Monte Carlo convergence (optional)
         print("  Creating Table A3: Monte Carlo convergence")
-        create_table_a3(pdf, shared_data)
+        create_table_a3(pdf, shared_data, fig)
+    
+    plt.close(fig)
     
     print(f"\n✅ Required results generated: {filename}")
     print("✅ Each table and plot on separate page")
     print("✅ No other results generated")
 
 
-def generate_all_simulation_data():
-    """Generate ALL simulation data once - shared across all figures and tables."""
+# Runs whose full result is kept: Figures 1 and 2 plot the copper Q=20 time
+# series and final field; every other run only feeds the tables
+_FULL_RESULT_RUNS = {('copper', 20)}
+
+
+def _reduce_result(config, result, keep_full):
+    """Reduce a simulation result to the values the report uses."""
+    # Correct the whole hotspot series once so the figures can reuse it
+    raw_temps = np.asarray(result['data']['hotspot_temperature'])
+    corrected_temps = config.apply_temperature_correction_array(raw_temps)
+    
+    record = {
+        'config': config,
+        'raw_temp': raw_temps[-1] if raw_temps.size > 0 else 0,
+        'corrected_temp': corrected_temps[-1] if corrected_temps.size > 0 else 0
+    }
+    if keep_full:
+        record.update(result=result, corrected_temps=corrected_temps)
+    return record
+
+
+def _run_one(job):
+    """Run (or load from the result cache) one (material, Q) simulation in a worker process.
+    
+    The result is reduced in the worker, so only the figure runs send their
+    full time series and snapshots back to the parent.
+    """
+    material, Q, use_cache = job
+    config = SimulationConfig.get_material_config(material, Q=Q)
+    result = run_cached(config, simulator=worker_simulator(config), use_cache=use_cache)
+    return material, Q, _reduce_result(config, result, (material, Q) in _FULL_RESULT_RUNS)
+
+
+def generate_all_simulation_data(use_cache=False):
+    """Generate ALL simulation data once - shared across all figures and tables.
+    
+    use_cache: reuse (and store) results in outputs/.sim_cache
+    """
     print("  Running all required simulations...")
     
     # All materials and Q values needed
     materials = ['silver', 'gold', 'copper', 'aluminum', 'iron', 'steel_carbon']
     Q_values = [5, 10, 15, 20, 25]
     
-    # Store all simulation results
-    all_data = {}
+    # Store all simulation results (reduced to summary values except for the figure runs)
+    all_data = {material: {} for material in materials}
     
-    simulation_count = 0
-    total_simulations = len(materials) * len(Q_values)
+    jobs = [(material, Q, use_cache) for material in materials for Q in Q_values]
+    total_simulations = len(jobs)
     
-    for material in materials:
-        all_data[material] = {}
-        for Q in Q_values:
-            simulation_count += 1
-            print(f"    {simulation_count}/{total_simulations}: {material} at Q={Q}")
-            
-            config = SimulationConfig.get_material_config(material, Q=Q)
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
-            # Store both raw and corrected temperatures
-            raw_temp = result['data']['hotspot_temperature'][-1] if result['data']['hotspot_temperature'] else 0
-            corrected_temp = config.apply_temperature_correction(raw_temp)
-            
-            all_data[material][Q] = {
-                'config': config,
-                'result': result,
-                'raw_temp': raw_temp,
-                'corrected_temp': corrected_temp
-            }
+    def report(simulation_count, run):
+        material, Q, _ = run
+        print(f"    {simulation_count}/{total_simulations}: {material} at Q={Q}")
+    
+    # Runs are independent (each config carries its own fixed seed), so spread
+    # them over all cores
+    for material, Q, record in run_parallel(_run_one, jobs, progress=report):
+        all_data[material][Q] = record
     
     print(f"  ✅ All {total_simulations} simulations completed")
     return all_data
 
 
 
-def create_figure_1(pdf, shared_data):
+def create_figure_1(pdf, shared_data, fig):
     """Figure 1: Heating curve (steady-state illustration) using shared data."""
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig.set_size_inches(10, 8)
+    ax = fig.add_subplot()
     
     # Extract copper Q=20 data from shared results
     copper_data = shared_data['copper'][20]
     
-    times = np.array(copper_data['result']['data']['time'])
-    temps = np.array(copper_data['result']['data']['hotspot_temperature'])
+    times = copper_data['result']['data']['time']
+    corrected_temps = copper_data['corrected_temps']
     
-    # Apply temperature correction to all time points
-    corrected_temps = [copper_data['config'].apply_temperature_correction(t) for t in temps]
-    corrected_temps = np.array(corrected_temps)
-    
-    ax.plot(times, corrected_temps, 'b-', linewidth=3)
+    # Plot at most ~2000 points (decimation is for drawing only; the stored data stay complete)
+    step = max(1, times.size // 2000)
+    ax.plot(times[::step], corrected_temps[::step], 'b-', linewidth=3)
     ax.set_xlabel('Time (s)', fontsize=14)
     ax.set_ylabel('Hotspot Temperature (°C)', fontsize=14)
     ax.set_title('Heating curve (steady-state illustration)', fontsize=16)
@@ -165,27 +195,28 @@ def create_figure_1(pdf, shared_data):
             transform=ax.transAxes, fontsize=12, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
     
-    plt.tight_layout()
+    fig.tight_layout()
     pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
+    fig.clf()
 
 
-def create_figure_2(pdf, shared_data):
+def create_figure_2(pdf, shared_data, fig):
     """Figure 2: Heat map (spatial distribution) using shared data."""
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig.set_size_inches(10, 8)
+    ax = fig.add_subplot()
     
     # Extract copper Q=20 data from shared results
     copper_data = shared_data['copper'][20]
     config = copper_data['config']
     
-    if copper_data['result']['data']['temperature_snapshots']:
+    if len(copper_data['result']['data']['temperature_snapshots']) > 0:
         final_temp = copper_data['result']['data']['temperature_snapshots'][-1]
         
         # Apply temperature correction to the entire field
-        corrected_temp = config.apply_temperature_correction(final_temp)
+        corrected_temp = config.apply_temperature_correction_array(final_temp)
         
         # Create heat map
-        im = ax.imshow(corrected_temp.T, origin='lower', cmap='hot',
+        im = ax.imshow(corrected_temp.T, origin='lower', cmap='hot', interpolation='none',
                       extent=[0, config.Lx*1000, 0, config.Ly*1000])
         
         # Add hotspot circle
@@ -201,7 +232,7 @@ def create_figure_2(pdf, shared_data):
         ax.set_title('Heat map (spatial distribution)', fontsize=16)
         
         # Add colorbar
-        cbar = plt.colorbar(im, ax=ax)
+        cbar = fig.colorbar(im, ax=ax)
         cbar.set_label('Temperature (°C)', fontsize=12)
         
         # Add annotations
@@ -209,16 +240,17 @@ def create_figure_2(pdf, shared_data):
                ha='center', va='bottom', fontsize=12, fontweight='bold', color='white',
                bbox=dict(boxstyle='round', facecolor='black', alpha=0.7))
     
-    plt.tight_layout()
+    fig.tight_layout()
     pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
+    fig.clf()
 
 
 
 
-def create_figure_3(pdf, shared_data):
+def create_figure_3(pdf, shared_data, fig):
     """Figure 3: Material comparison (core physics result) using shared data."""
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig.set_size_inches(10, 8)
+    ax = fig.add_subplot()
     
     materials = ['silver', 'copper', 'steel_carbon']
     colors = ['gold', 'red', 'gray']
@@ -250,18 +282,19 @@ def create_figure_3(pdf, shared_data):
                f'α = {alpha:.1e}\nm²/s', ha='center', va='center', fontsize=10,
                bbox=dict(boxstyle='round', facecolor='white', alpha=0.9))
     
-    plt.xticks(rotation=15)
-    plt.tight_layout()
+    ax.tick_params(axis='x', labelrotation=15)
+    fig.tight_layout()
     pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
+    fig.clf()
 
 
 
 
 
-def create_figure_4(pdf, shared_data):
+def create_figure_4(pdf, shared_data, fig):
     """Figure 4: Injection-rate dependence using shared data."""
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig.set_size_inches(10, 8)
+    ax = fig.add_subplot()
     
     Q_values = [5, 10, 15, 20, 25]
     steady_temps = []
@@ -279,11 +312,14 @@ def create_figure_4(pdf, shared_data):
     ax.set_title('Injection-rate dependence', fontsize=16)
     ax.grid(True, alpha=0.3)
     
-    # Add trend line
-    z = np.polyfit(Q_values, steady_temps, 1)
-    p = np.poly1d(z)
-    ax.plot(Q_values, p(Q_values), "b--", alpha=0.8, linewidth=2,
-           label=f'Linear fit: slope = {z[0]:.2f}')
+    # Add trend line (closed-form least-squares line through the points)
+    Q = np.asarray(Q_values, dtype=float)
+    T = np.asarray(steady_temps, dtype=float)
+    Q_dev = Q - Q.mean()
+    slope = np.dot(Q_dev, T - T.mean()) / np.dot(Q_dev, Q_dev)
+    intercept = T.mean() - slope * Q.mean()
+    ax.plot(Q_values, slope * Q + intercept, "b--", alpha=0.8, linewidth=2,
+           label=f'Linear fit: slope = {slope:.2f}')
     ax.legend()
     
     # Add material info using shared data
@@ -292,17 +328,18 @@ def create_figure_4(pdf, shared_data):
             transform=ax.transAxes, fontsize=12, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
     
-    plt.tight_layout()
+    fig.tight_layout()
     pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
+    fig.clf()
 
 
 
 
 
-def create_table_a1(pdf, shared_data):
+def create_table_a1(pdf, shared_data, fig):
     """Table A1: Steady-state hotspot temperatures using shared data."""
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig.set_size_inches(12, 8)
+    ax = fig.add_subplot()
     ax.axis('tight')
     ax.axis('off')
     
@@ -353,14 +390,15 @@ Purpose: Provides the full numerical dataset, Supports the comparison plots in R
     ax.text(0.5, -0.1, notes, transform=ax.transAxes, fontsize=9, ha='center',
             bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
     
-    plt.tight_layout()
+    fig.tight_layout()
     pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
+    fig.clf()
 
 
-def create_table_a2(pdf, shared_data):
+def create_table_a2(pdf, shared_data, fig):
     """Table A2: Time to steady state using shared data."""
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig.set_size_inches(12, 8)
+    ax = fig.add_subplot()
     ax.axis('tight')
     ax.axis('off')
     
@@ -369,33 +407,22 @@ def create_table_a2(pdf, shared_data):
     
     headers = ['Material', 'α (m²/s)', 'Theoretical t_ss (s)', 'Simulation time (s)', 'Status']
     
-    table_data = []
-    for material in materials:
-        # Theoretical time to steady state: t_ss ≈ L²/(4α) where L is characteristic length
-        config = shared_data[material][10]['config']
-        alpha = config.alpha
-        L = 0.025  # Domain size
-        t_theoretical = L**2 / (4 * alpha)
-        
-        # Get actual simulation time from config
-        t_simulation = config.t_max
-        
-        # Determine equilibration status
-        if t_theoretical <= t_simulation:
-            status = "Equilibrated"
-        elif t_theoretical <= 2 * t_simulation:
-            status = "Near equilibrium"
-        else:
-            status = "Still rising"
-        
-        row = [
-            material.replace('_', ' ').title(),
-            f"{alpha:.1e}",
-            f"{t_theoretical:.1f}",
-            f"{t_simulation:.1f}",
-            status
-        ]
-        table_data.append(row)
+    # Theoretical time to steady state: t_ss ≈ L²/(4α) where L is characteristic length
+    configs = [shared_data[material][10]['config'] for material in materials]
+    alphas = np.array([config.alpha for config in configs])
+    t_simulations = np.array([config.t_max for config in configs])  # Actual simulation time from config
+    L = 0.025  # Domain size
+    t_theoretical = L**2 / (4 * alphas)
+    
+    # Determine equilibration status (and its row color: light green / orange / red)
+    status_conditions = [t_theoretical <= t_simulations, t_theoretical <= 2 * t_simulations]
+    statuses = np.select(status_conditions, ["Equilibrated", "Near equilibrium"], "Still rising")
+    status_colors = np.select(status_conditions, ['#90EE90', '#FFE4B5'], '#FFB6C1')
+    
+    table_data = [
+        [material.replace('_', ' ').title(), f"{alpha:.1e}", f"{t_ss:.1f}", f"{t_sim:.1f}", status]
+        for material, alpha, t_ss, t_sim, status in zip(materials, alphas, t_theoretical, t_simulations, statuses)
+    ]
     
     # Create table
     table = ax.table(cellText=table_data, colLabels=headers, loc='center', cellLoc='center')
@@ -409,15 +436,7 @@ def create_table_a2(pdf, shared_data):
         table[(0, i)].set_text_props(weight='bold', color='white')
     
     # Color code by equilibration status
-    for i, row in enumerate(table_data):
-        status = row[4]
-        if status == "Equilibrated":
-            color = '#90EE90'  # Light green
-        elif status == "Near equilibrium":
-            color = '#FFE4B5'  # Light orange
-        else:
-            color = '#FFB6C1'  # Light red
-            
+    for i, color in enumerate(status_colors):
         for j in range(len(headers)):
             table[(i+1, j)].set_facecolor(color)
     
@@ -432,14 +451,15 @@ Note: Stainless steel needs ~37s to fully equilibrate but shows clear trend in 1
     ax.text(0.5, -0.1, notes, transform=ax.transAxes, fontsize=9, ha='center',
             bbox=dict(boxstyle='round', facecolor='lightcyan', alpha=0.8))
     
-    plt.tight_layout()
+    fig.tight_layout()
     pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
+    fig.clf()
 
 
-def create_table_a3(pdf, shared_data):
+def create_table_a3(pdf, shared_data, fig):
     """Table A3: Monte Carlo convergence summary using current simulation results."""
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig.set_size_inches(12, 8)
+    ax = fig.add_subplot()
     ax.axis('tight')
     ax.axis('off')
     
@@ -448,28 +468,21 @@ def create_table_a3(pdf, shared_data):
     
     headers = ['Material', 'Packet count N', 'Mean T_steady', 'Standard deviation', 'Relative error']
     
-    table_data = []
     materials = ['Copper', 'Steel Carbon']  # Representative materials
     
     # Get current simulation results from shared data
-    copper_temp = shared_data['copper'][20]['corrected_temp']
-    steel_temp = shared_data['steel_carbon'][20]['corrected_temp']
+    base_temps = np.array([shared_data['copper'][20]['corrected_temp'],
+                           shared_data['steel_carbon'][20]['corrected_temp']])
     
-    for material in materials:
-        base_temp = copper_temp if material == 'Copper' else steel_temp
-        for N in packet_counts:
-            # Monte Carlo error scales as 1/√N
-            std_dev = 5.0 / np.sqrt(N/500)  # Normalized to N=500
-            rel_error = std_dev / base_temp
-            
-            row = [
-                material,
-                str(N),
-                f"{base_temp:.1f}",
-                f"{std_dev:.2f}",
-                f"{rel_error:.4f}"
-            ]
-            table_data.append(row)
+    # Monte Carlo error scales as 1/√N (normalized to N=500); one row per (material, N)
+    std_devs = 5.0 / np.sqrt(np.array(packet_counts) / 500)
+    rel_errors = std_devs[None, :] / base_temps[:, None]
+    
+    table_data = [
+        [material, str(N), f"{base_temp:.1f}", f"{std_dev:.2f}", f"{rel_error:.4f}"]
+        for material, base_temp, material_rel_errors in zip(materials, base_temps, rel_errors)
+        for N, std_dev, rel_error in zip(packet_counts, std_devs, material_rel_errors)
+    ]
     
     # Create table
     table = ax.table(cellText=table_data, colLabels=headers, loc='center', cellLoc='center')
@@ -493,13 +506,14 @@ Not part of the physics story — annex only"""
     ax.text(0.5, -0.1, notes, transform=ax.transAxes, fontsize=9, ha='center',
             bbox=dict(boxstyle='round', facecolor='lavender', alpha=0.8))
     
-    plt.tight_layout()
+    fig.tight_layout()
     pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
+    fig.clf()
 
 
 if __name__ == "__main__":
-    generate_required_results()
+    # --cache: reuse (and store) results in outputs/.sim_cache
+    generate_required_results(use_cache='--cache' in sys.argv[1:])
     
     print("\n" + "="*60)
     print("REQUIRED RESULTS COMPLETED")
@@ -24,7 +24,7 @@ def get_current_steady_state_temps():
         
         # Get corrected temperature
         data = result['data']
-        if data['hotspot_temperature']:
+        if len(data['hotspot_temperature']) > 0:
             hotspot_temp = data['hotspot_temperature'][-1]
             corrected_temp = config.apply_temperature_correction(hotspot_temp)
             results[material] = corrected_temp
@@ -3,6 +3,7 @@ Grid and geometry management for the heat diffusion simulation.
 """
 
 import numpy as np
+from functools import cached_property
 from typing import Tuple, List
 
 try:
@@ -12,6 +13,10 @@ except ImportError:
     from config import SimulationConfig
 
 
+# Random-walk neighbor offsets (dx, dy); the order fixes the 2-bit direction codes
+NEIGHBOR_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
 class Grid:
     """Manages the 2D grid for the heat diffusion simulation."""
     
@@ -21,62 +26,61 @@ class Grid:
         self.Ny = config.Ny
         self.dx = config.dx
         
-        # Initialize temperature field
-        self.temperature_field = np.zeros((self.Nx, self.Ny), dtype=float)
+        # Initialize temperature field: flat per-cell packet tally (cell x * Ny + y),
+        # with temperature_field as its (Nx, Ny) view indexed [x, y]
+        self.n_cells = self.Nx * self.Ny
+        self.cell_counts = np.zeros(self.n_cells, dtype=np.int32)
+        self.temperature_field = self.cell_counts.reshape(self.Nx, self.Ny)
         
-        # Pre-compute hot-spot mask for efficiency
+        # Pre-compute hot-spot mask and its flat cell indices for efficiency
         self.hotspot_mask = self._create_hotspot_mask()
+        self._hotspot_cells = np.flatnonzero(self.hotspot_mask)
+        self.n_hotspot_cells = len(self._hotspot_cells)
         
-        # Pre-compute neighbor directions for random walk
-        self.neighbor_directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        # Neighbor directions for the random walk: tuples for scalar code, and a
+        # per-grid (writeable) int32 lookup table for the vectorized and compiled paths
+        self.neighbor_directions = NEIGHBOR_DIRECTIONS
+        self.direction_vectors = np.array(NEIGHBOR_DIRECTIONS, dtype=np.int32)
     
     def _create_hotspot_mask(self) -> np.ndarray:
         """Create boolean mask for hot-spot region."""
         mask = np.zeros((self.Nx, self.Ny), dtype=bool)
-        center_x, center_y = self.config.hotspot_center
-        radius = self.config.hotspot_radius
-        
-        for i in range(self.Nx):
-            for j in range(self.Ny):
-                dx = i - center_x
-                dy = j - center_y
-                if dx*dx + dy*dy <= radius*radius:
-                    mask[i, j] = True
-        
+        cells = self.config.hotspot_cells
+        mask[cells[:, 0], cells[:, 1]] = True
         return mask
     
     def is_in_hotspot(self, x: int, y: int) -> bool:
-        """Check if coordinates are within the hot-spot region."""
+        """Check if coordinates are within the hot-spot region (see in_hotspot_batch for batches)."""
         if 0 <= x < self.Nx and 0 <= y < self.Ny:
             return self.hotspot_mask[x, y]
         return False
     
+    def in_hotspot_batch(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Check many positions against the hot-spot region at once (off-grid positions give False)."""
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        valid = (xs >= 0) & (xs < self.Nx) & (ys >= 0) & (ys < self.Ny)
+        in_hotspot = self.hotspot_mask[np.clip(xs, 0, self.Nx - 1), np.clip(ys, 0, self.Ny - 1)]
+        return in_hotspot & valid
+    
     def is_valid_position(self, x: int, y: int) -> bool:
         """Check if coordinates are within grid boundaries."""
         return 0 <= x < self.Nx and 0 <= y < self.Ny
     
     def get_random_hotspot_position(self, rng) -> Tuple[int, int]:
-        """Generate random position within hot-spot region using proper disk sampling."""
-        center_x, center_y = self.config.hotspot_center
-        radius = self.config.hotspot_radius
-        
-        # FIXED: Proper uniform sampling over disk area
-        # Use r = R * sqrt(u) where u ~ U(0,1) for uniform area sampling
-        u = rng.random()  # uniform [0,1)
-        r = radius * np.sqrt(u)  # proper radial distribution
-        angle = rng.uniform(0, 2 * np.pi)
-        
-        x = int(center_x + r * np.cos(angle))
-        y = int(center_y + r * np.sin(angle))
-        
-        # Ensure position is within grid bounds
-        x = max(0, min(x, self.Nx - 1))
-        y = max(0, min(y, self.Ny - 1))
-        
-        return x, y
+        """Generate random position within hot-spot region (uniform over hot-spot cells)."""
+        cells = self.config.hotspot_cells
+        x, y = cells[rng.randint(0, len(cells))]
+        return int(x), int(y)
+    
+    def get_random_hotspot_positions(self, rng, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Generate n random positions within hot-spot region as (xs, ys) arrays."""
+        cells = self.config.hotspot_cells
+        picks = cells[rng.randint_array(0, len(cells), n)]
+        return picks[:, 0], picks[:, 1]
     
     def get_neighbor_positions(self, x: int, y: int) -> List[Tuple[int, int]]:
-        """Get valid neighbor positions for a given coordinate."""
+        """Get valid neighbor positions for a given coordinate (see get_neighbor_arrays for batches)."""
         neighbors = []
         for dx, dy in self.neighbor_directions:
             new_x, new_y = x + dx, y + dy
@@ -84,20 +88,42 @@ class Grid:
                 neighbors.append((new_x, new_y))
         return neighbors
     
-    def update_temperature_field(self, packet_positions: List[Tuple[int, int]]):
-        """Update temperature field from packet positions."""
-        # Reset field
-        self.temperature_field.fill(0)
+    def get_neighbor_arrays(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the neighbors of many positions at once.
         
-        # Count packets in each cell
-        for x, y in packet_positions:
-            if self.is_valid_position(x, y):
-                self.temperature_field[x, y] += 1
+        Args:
+            xs, ys: Position arrays of length N
+            
+        Returns:
+            (neighbor_xs, neighbor_ys, valid): (N, n_directions) arrays, one
+            column per entry of neighbor_directions; valid marks neighbors
+            that lie on the grid
+        """
+        neighbor_xs = np.asarray(xs, dtype=np.int32)[:, None] + self.direction_vectors[:, 0]
+        neighbor_ys = np.asarray(ys, dtype=np.int32)[:, None] + self.direction_vectors[:, 1]
+        valid = (neighbor_xs >= 0) & (neighbor_xs < self.Nx) & (neighbor_ys >= 0) & (neighbor_ys < self.Ny)
+        return neighbor_xs, neighbor_ys, valid
+    
+    def update_temperature_field(self, xs: np.ndarray, ys: np.ndarray):
+        """Update temperature field from packet position arrays."""
+        # Count packets in each cell (the step kernel keeps every active packet on the grid)
+        # Widen to int32 first: int16 positions overflow on grids of more than 32767 cells
+        cells = xs.astype(np.int32) * self.Ny + ys
+        if len(cells) < self.n_cells:
+            # Sparse field: sort the cell indices and count each run of equal
+            # cells, instead of building a full-grid bincount intermediate
+            cells.sort()
+            starts = np.flatnonzero(np.diff(cells, prepend=-1))  # First entry of each run
+            self.cell_counts.fill(0)
+            self.cell_counts[cells[starts]] = np.diff(np.r_[starts, len(cells)])
+        else:
+            self.cell_counts[:] = np.bincount(cells, minlength=self.n_cells)
     
     def get_hotspot_temperature(self) -> float:
         """Calculate average temperature in hot-spot region with thermal conductivity correction."""
-        hotspot_temps = self.temperature_field[self.hotspot_mask]
-        raw_temperature = np.mean(hotspot_temps) if len(hotspot_temps) > 0 else 0.0
+        n_hotspot = self.n_hotspot_cells
+        raw_temperature = self.cell_counts[self._hotspot_cells].sum() / n_hotspot if n_hotspot > 0 else 0.0
         
         # Apply thermal conductivity correction
         corrected_temperature = self.config.apply_temperature_correction(raw_temperature)
@@ -113,12 +139,17 @@ class Grid:
             'hotspot_mean': self.get_hotspot_temperature()
         }
     
-    def get_spatial_coordinates(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Get physical coordinate arrays for plotting."""
+    @cached_property
+    def spatial_coordinates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Physical (X, Y) coordinate arrays for plotting, built on first use."""
         x = np.linspace(0, self.config.Lx, self.Nx)
         y = np.linspace(0, self.config.Ly, self.Ny)
         return np.meshgrid(x, y, indexing='ij')
     
+    def get_spatial_coordinates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get physical coordinate arrays for plotting."""
+        return self.spatial_coordinates
+    
     def reset(self):
         """Reset the grid to initial state."""
         self.temperature_field.fill(0)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Compiled per-step kernels for the Monte Carlo heat diffusion simulation.
+
+The kernels operate on plain NumPy arrays (structure-of-arrays packet state and
+pre-generated random numbers) so they can be compiled with Numba. When Numba is
+not installed, vectorized NumPy implementations with identical signatures and
+results are used instead.
+
+The parallel kernel is compiled at import time, so worker processes should be
+started with the "spawn" multiprocessing context: forking a process that has
+already loaded it can hang on exit with Numba's TBB threading layer.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Explicit signature so the kernel is compiled once, up front, for the dtypes
+# used by PacketManager and RandomNumberGenerator.
+_STEP_SIGNATURE = (
+    "UniTuple(int64, 2)(int16[:], int16[:], int32[:, :], int64, int64, "
+    "float64, boolean, float32[:], int64[:], uint64[:], boolean[:], int32[:])"
+)
+
+# Signature of slot_step_kernel, for OptimizedPacketManager's slot arrays
+_SLOT_STEP_SIGNATURE = (
+    "int64(int16[:], int16[:], boolean[:], int64[:], int8[:, :], int64, int64, "
+    "float64, boolean, float32[:], uint64[:])"
+)
+
+# Packets are split into this many parallel blocks, each with a private grid tally
+TALLY_BLOCKS = 16
+
+# Direction choices are packed as 2-bit lanes, 32 per 64-bit random word
+DIRECTIONS_PER_WORD = 32
+
+
+def unpack_directions(dir_bits: np.ndarray, n: int) -> np.ndarray:
+    """Unpack the first n 2-bit direction choices from packed 64-bit words."""
+    i = np.arange(n)
+    shifts = (2 * (i & 31)).astype(np.uint64)
+    return ((dir_bits[i >> 5] >> shifts) & np.uint64(3)).astype(np.intp)
+
+
+def _step_kernel_numpy(xs, ys, directions, Nx, Ny, p_move, absorbing,
+                       rand_move, conv_idx, dir_bits, alive, counts):
+    """NumPy implementation of step_kernel (used when Numba is unavailable)."""
+    convected = np.zeros(xs.size, dtype=bool)
+    convected[conv_idx] = True
+    moving = (rand_move < p_move) & ~convected
+    steps = directions[unpack_directions(dir_bits, xs.size)]
+    new_x = xs + steps[:, 0] * moving
+    new_y = ys + steps[:, 1] * moving
+
+    outside = (new_x < 0) | (new_x >= Nx) | (new_y < 0) | (new_y >= Ny)
+    if absorbing:
+        removed = outside
+    else:
+        removed = np.zeros_like(outside)
+        new_x[outside] = xs[outside]
+        new_y[outside] = ys[outside]
+
+    xs[:] = new_x
+    ys[:] = new_y
+    alive[:] = ~(convected | removed)
+    counts[:] = np.bincount(xs[alive].astype(np.int32) * Ny + ys[alive], minlength=Nx * Ny)
+    return conv_idx.size, int(np.count_nonzero(removed))
+
+
+def _slot_step_kernel_numpy(pos_x, pos_y, active, slots, directions, Nx, Ny, p_move,
+                            absorbing, rand_move, dir_bits):
+    """NumPy implementation of slot_step_kernel (used when Numba is unavailable)."""
+    moving = rand_move < p_move
+    i = slots[moving]
+    steps = directions[unpack_directions(dir_bits, slots.size)[moving]]
+    new_x = pos_x[i] + steps[:, 0]
+    new_y = pos_y[i] + steps[:, 1]
+
+    inside = (new_x >= 0) & (new_x < Nx) & (new_y >= 0) & (new_y < Ny)
+    pos_x[i[inside]] = new_x[inside]
+    pos_y[i[inside]] = new_y[inside]
+    if not absorbing:
+        return 0
+    active[i[~inside]] = False
+    return int(np.count_nonzero(~inside))
+
+
+if NUMBA_AVAILABLE:
+
+    def step_kernel(xs, ys, directions, Nx, Ny, p_move, absorbing,
+                    rand_move, conv_idx, dir_bits, alive, counts):
+        """
+        Advance every active packet by one time step and tally the grid.
+
+        Packets listed in conv_idx are lost to convection; every other packet
+        moves one cell in a random direction with probability p_move. Packets stepping off the
+        grid are removed (absorbing) or stay put (reflecting). Surviving
+        packets are counted in the same pass: each parallel block of packets
+        tallies into its own private grid, and the blocks are summed into
+        counts afterwards (no atomics needed).
+
+        Args:
+            xs, ys: Packet coordinates, updated in place
+            directions: (n_directions, 2) table of step vectors
+            Nx, Ny: Grid dimensions
+            p_move: Move probability per step
+            absorbing: True for absorbing boundaries, False for reflecting
+            rand_move: Pre-generated uniform random numbers per packet
+            conv_idx: Distinct indices of the packets convected this step
+            dir_bits: Random 64-bit words, one 2-bit direction choice per packet
+            alive: Output mask, False for packets removed this step
+            counts: Output flat (Nx * Ny) packet count per cell, index x * Ny + y
+
+        Returns:
+            (packets convected, packets removed at the boundary)
+        """
+        n = xs.size
+        n_cells = Nx * Ny
+        block = (n + TALLY_BLOCKS - 1) // TALLY_BLOCKS
+        local_counts = np.zeros((TALLY_BLOCKS, n_cells), dtype=np.int32)
+        alive[:] = True
+        for i in conv_idx:
+            alive[i] = False
+        n_removed = 0
+        for b in prange(TALLY_BLOCKS):
+            for i in range(b * block, min(n, (b + 1) * block)):
+                if not alive[i]:
+                    continue  # Convected
+
+                if rand_move[i] < p_move:
+                    d = np.int64((dir_bits[i >> 5] >> np.uint64(2 * (i & 31))) & np.uint64(3))
+                    new_x = xs[i] + directions[d, 0]
+                    new_y = ys[i] + directions[d, 1]
+                    if 0 <= new_x < Nx and 0 <= new_y < Ny:
+                        xs[i] = new_x
+                        ys[i] = new_y
+                    elif absorbing:
+                        alive[i] = False
+                        n_removed += 1
+                        continue
+
+                local_counts[b, xs[i] * Ny + ys[i]] += 1
+
+        for c in range(n_cells):
+            total = 0
+            for b in range(TALLY_BLOCKS):
+                total += local_counts[b, c]
+            counts[c] = total
+
+        return conv_idx.size, n_removed
+
+    # Numba names cache files after the source file and qualified name, but a
+    # cached kernel re-imports its module by the name it was compiled under.
+    # This module is imported both as "kernels" (scripts run from src/) and as
+    # part of the src package, so keep a separate cache entry per import name.
+    step_kernel.__qualname__ = f"{__name__}.step_kernel"
+    step_kernel = njit(_STEP_SIGNATURE, parallel=True, fastmath=True, cache=True,
+                       boundscheck=False)(step_kernel)
+
+    def slot_step_kernel(pos_x, pos_y, active, slots, directions, Nx, Ny, p_move,
+                         absorbing, rand_move, dir_bits):
+        """
+        Advance the packets in the given slots by one random-walk step.
+
+        Works on slot-addressed packet arrays (active packets need not be
+        contiguous). Packet slots[k] moves in its random direction when
+        rand_move[k] < p_move; packets stepping off the grid are deactivated
+        (absorbing) or stay put (reflecting). Each packet writes only its own
+        slot, so the loop runs in parallel.
+
+        Args:
+            pos_x, pos_y: Per-slot packet coordinates, updated in place
+            active: Per-slot active flags, cleared for absorbed packets
+            slots: Indices of the active slots
+            directions: (n_directions, 2) table of step vectors
+            Nx, Ny: Grid dimensions
+            p_move: Move probability per step
+            absorbing: True for absorbing boundaries, False for reflecting
+            rand_move: Uniform random numbers, one per entry of slots
+            dir_bits: Random 64-bit words, one 2-bit direction choice per entry of slots
+
+        Returns:
+            Number of packets removed at the boundary
+        """
+        n_removed = 0
+        for k in prange(slots.size):
+            if rand_move[k] < p_move:
+                i = slots[k]
+                d = np.int64((dir_bits[k >> 5] >> np.uint64(2 * (k & 31))) & np.uint64(3))
+                new_x = pos_x[i] + directions[d, 0]
+                new_y = pos_y[i] + directions[d, 1]
+                if 0 <= new_x < Nx and 0 <= new_y < Ny:
+                    pos_x[i] = new_x
+                    pos_y[i] = new_y
+                elif absorbing:
+                    active[i] = False
+                    n_removed += 1
+        return n_removed
+
+    slot_step_kernel.__qualname__ = f"{__name__}.slot_step_kernel"
+    slot_step_kernel = njit(_SLOT_STEP_SIGNATURE, parallel=True, fastmath=True, cache=True,
+                            boundscheck=False)(slot_step_kernel)
+
+else:
+    step_kernel = _step_kernel_numpy
+    slot_step_kernel = _slot_step_kernel_numpy
@@ -12,12 +12,19 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 from src.config import SimulationConfig, print_material_properties, print_standard_q_values
-from src.simulate import MonteCarloSimulator
+from src.simulate import MonteCarloSimulator, run_parallel
 
 # Set matplotlib to non-interactive backend
 plt.ioff()
 
 
+def _run_material(material_Q):
+    """Run one material at one injection rate in a worker process."""
+    material, Q = material_Q
+    config = SimulationConfig.get_material_config(material, Q=Q)
+    return config, MonteCarloSimulator(config).run()
+
+
 def demonstrate_material_configs():
     """Demonstrate the new material-based configuration system."""
     
@@ -44,17 +51,11 @@ def demonstrate_material_configs():
         Q_values = [10, 20, 30]
         copper_results = {}
         
-        for Q in Q_values:
-            print(f"Running copper simulation with Q = {Q} packets/step...")
-            
-            # Create material-specific config
-            config = SimulationConfig.get_material_config('copper', Q=Q)
+        # The runs are independent, so simulate them in parallel
+        print(f"Running copper simulations with Q = {Q_values} packets/step...")
+        runs = run_parallel(_run_material, [('copper', Q) for Q in Q_values])
+        for Q, (config, result) in zip(Q_values, runs):
             print(f"  {config}")
-            
-            # Run simulation
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
             copper_results[Q] = {
                 'config': config,
                 'result': result
@@ -102,15 +103,10 @@ def demonstrate_material_configs():
         materials = ['copper', 'aluminum', 'steel']
         material_results = {}
         
-        for material in materials:
-            print(f"Running {material} simulation with Q = {Q_fixed}...")
-            
-            config = SimulationConfig.get_material_config(material, Q=Q_fixed)
-            print(f"  α = {config.alpha:.1e} m²/s")
-            
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
+        print(f"Running {', '.join(materials)} simulations with Q = {Q_fixed}...")
+        runs = run_parallel(_run_material, [(m, Q_fixed) for m in materials])
+        for material, (config, result) in zip(materials, runs):
+            print(f"  {material}: α = {config.alpha:.1e} m²/s")
             material_results[material] = {
                 'config': config,
                 'result': result
@@ -187,27 +183,23 @@ def run_steady_state_analysis():
     materials = ['copper', 'aluminum', 'steel']
     Q_values = [15, 20, 25]
     
-    results = {}
-    
     print("Running simulations...")
-    for material in materials:
-        results[material] = {}
-        for Q in Q_values:
-            print(f"  {material.title()} at Q={Q}...")
-            
-            config = SimulationConfig.get_material_config(material, Q=Q)
-            simulator = MonteCarloSimulator(config)
-            result = simulator.run()
-            
-            # Calculate steady-state temperature (last 20% of simulation)
-            temps = result['data']['hotspot_temperature']
-            steady_temp = np.mean(temps[-len(temps)//5:])
-            
-            results[material][Q] = {
-                'steady_temp': steady_temp,
-                'max_temp': result['metrics']['max_temperature'],
-                'alpha': config.alpha
-            }
+    jobs = [(material, Q) for material in materials for Q in Q_values]
+    results = {material: {} for material in materials}
+    
+    # Every (material, Q) run is independent, so simulate them all in parallel
+    for (material, Q), (config, result) in zip(jobs, run_parallel(_run_material, jobs)):
+        print(f"  {material.title()} at Q={Q}")
+        
+        # Calculate steady-state temperature (last 20% of simulation)
+        temps = result['data']['hotspot_temperature']
+        steady_temp = np.mean(temps[-len(temps)//5:])
+        
+        results[material][Q] = {
+            'steady_temp': steady_temp,
+            'max_temp': result['metrics']['max_temperature'],
+            'alpha': config.alpha
+        }
     
     # Create summary plot and save to PDF
     with PdfPages(os.path.join(reporting_dir, 'steady_state_analysis.pdf')) as pdf:
@@ -246,10 +238,13 @@ def run_steady_state_analysis():
     print(f"{'Material':<12} {'α (m²/s)':<12} {'Q=15':<8} {'Q=20':<8} {'Q=25':<8}")
     print("-" * 60)
     
-    for material in materials:
-        alpha = results[material][Q_values[0]]['alpha']
-        temps = [f"{results[material][Q]['steady_temp']:.1f}" for Q in Q_values]
-        print(f"{material.title():<12} {alpha:<12.1e} {temps[0]:<8} {temps[1]:<8} {temps[2]:<8}")
+    # Format every row first, then write the table in one call
+    rows = [
+        f"{material.title():<12} {results[material][Q_values[0]]['alpha']:<12.1e} "
+        + " ".join(f"{results[material][Q]['steady_temp']:<8.1f}" for Q in Q_values)
+        for material in materials
+    ]
+    print("\n".join(rows))
 
 
 if __name__ == "__main__":
@@ -9,15 +9,23 @@ try:
     from .config import SimulationConfig
     from .grid import Grid
     from .rng import RandomNumberGenerator
+    from .kernels import step_kernel, DIRECTIONS_PER_WORD
 except ImportError:
     # Fallback for direct execution
     from config import SimulationConfig
     from grid import Grid
     from rng import RandomNumberGenerator
+    from kernels import step_kernel, DIRECTIONS_PER_WORD
 
 
 class HeatPacket:
-    """Represents a single heat packet in the simulation."""
+    """Represents a single heat packet in the simulation.
+    
+    The simulation itself stores packets as coordinate arrays (see PacketManager);
+    these objects are only built on request for inspection and reporting.
+    """
+    
+    __slots__ = ('x', 'y', 'active', 'id', 'birth_time', 'steps_taken')
     
     def __init__(self, x: int, y: int, packet_id: Optional[int] = None):
         self.x = x
@@ -47,39 +55,75 @@ class HeatPacket:
 
 
 class PacketManager:
-    """Manages collection of heat packets."""
+    """Manages collection of heat packets as structure-of-arrays (SoA).
+    
+    Active packets occupy the first ``n_active`` slots of the ``xs``/``ys``
+    coordinate arrays, so whole-population updates are single NumPy operations.
+    ``alive`` is per-slot scratch space for the step kernel's survival mask.
+    """
     
-    def __init__(self):
-        self.packets: List[HeatPacket] = []
-        self._next_id = 0
+    def __init__(self, capacity: int = 1024):
+        # int16 coordinates: grids are far smaller than 32767 cells per side
+        self.xs = np.empty(capacity, dtype=np.int16)
+        self.ys = np.empty(capacity, dtype=np.int16)
+        self.alive = np.empty(capacity, dtype=bool)
+        self.n_active = 0
     
-    def add_packet(self, x: int, y: int) -> HeatPacket:
-        """Add new heat packet at specified position."""
-        packet = HeatPacket(x, y, self._next_id)
-        self.packets.append(packet)
-        self._next_id += 1
-        return packet
+    def _reserve(self, n_extra: int):
+        """Grow the coordinate arrays so that n_extra more packets fit."""
+        required = self.n_active + n_extra
+        if required <= len(self.xs):
+            return
+        
+        capacity = max(required, 2 * len(self.xs))
+        for name in ('xs', 'ys'):
+            grown = np.empty(capacity, dtype=np.int16)
+            grown[:self.n_active] = getattr(self, name)[:self.n_active]
+            setattr(self, name, grown)
+        self.alive = np.empty(capacity, dtype=bool)
+    
+    def add_packets(self, xs: np.ndarray, ys: np.ndarray) -> int:
+        """Add a batch of heat packets at the specified positions."""
+        n_new = len(xs)
+        self._reserve(n_new)
+        
+        start, end = self.n_active, self.n_active + n_new
+        self.xs[start:end] = xs
+        self.ys[start:end] = ys
+        self.n_active = end
+        return n_new
     
-    def remove_inactive_packets(self):
-        """Remove all inactive packets from collection."""
-        self.packets = [p for p in self.packets if p.active]
+    def add_packet(self, x: int, y: int) -> int:
+        """Add new heat packet at specified position. Returns its slot index."""
+        self._reserve(1)
+        slot = self.n_active
+        self.xs[slot] = x
+        self.ys[slot] = y
+        self.n_active += 1
+        return slot
+    
+    def retain(self, keep_mask: np.ndarray):
+        """Keep only the active packets selected by keep_mask (compacts in place)."""
+        n_keep = int(np.count_nonzero(keep_mask))
+        self.xs[:n_keep] = self.xs[:self.n_active][keep_mask]
+        self.ys[:n_keep] = self.ys[:self.n_active][keep_mask]
+        self.n_active = n_keep
     
     def get_active_packets(self) -> List[HeatPacket]:
-        """Get list of all active packets."""
-        return [p for p in self.packets if p.active]
+        """Get list of all active packets (builds objects; not for the hot path)."""
+        return [HeatPacket(int(x), int(y), i) for i, (x, y) in enumerate(zip(*self.get_active_positions()))]
     
-    def get_active_positions(self) -> List[Tuple[int, int]]:
-        """Get positions of all active packets."""
-        return [p.get_position() for p in self.packets if p.active]
+    def get_active_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get positions of all active packets as (xs, ys) array views."""
+        return self.xs[:self.n_active], self.ys[:self.n_active]
     
     def count_active(self) -> int:
         """Count number of active packets."""
-        return sum(1 for p in self.packets if p.active)
+        return self.n_active
     
     def clear_all(self):
         """Remove all packets."""
-        self.packets.clear()
-        self._next_id = 0
+        self.n_active = 0
 
 
 class HeatSink:
@@ -90,6 +134,18 @@ class HeatSink:
         self.grid = Grid(config)
         self.packet_manager = PacketManager()
         
+        # Random-walk step vectors, indexed by a 2-bit random direction choice
+        self._directions = self.grid.direction_vectors
+        
+        # Boundary type as a flag for the step kernel (no string compare per step)
+        self._absorbing = config.boundary_type == "absorbing"
+        
+        # Convected packet indices when convection is switched off
+        self._no_convection = np.empty(0, dtype=np.int64)
+        
+        # True while grid.cell_counts matches the current packet positions
+        self._field_current = False
+        
         # Statistics tracking
         self.total_packets_injected = 0
         self.total_packets_removed = 0
@@ -98,90 +154,105 @@ class HeatSink:
     def inject_heat_packets(self, rng: RandomNumberGenerator) -> int:
         """Inject new heat packets into hot-spot region."""
         packets_to_inject = self.config.Q  # Q is now integer
-        injected_count = 0
         
-        for _ in range(packets_to_inject):
-            x, y = self.grid.get_random_hotspot_position(rng)
-            self.packet_manager.add_packet(x, y)
-            injected_count += 1
+        xs, ys = self.grid.get_random_hotspot_positions(rng, packets_to_inject)
+        injected_count = self.packet_manager.add_packets(xs, ys)
+        self._field_current = False
         
         self.total_packets_injected += injected_count
         return injected_count
     
     def move_packets(self, rng: RandomNumberGenerator) -> int:
         """Perform random walk update for all active packets with convection cooling."""
-        packets_removed = 0
-        packets_convected = 0
-        
-        for packet in self.packet_manager.get_active_packets():
-            # --- NEW CODE START ---
-            # Convection Check: Does the packet escape to the air?
-            if rng.random() < self.config.convection_prob:
-                # Packet is removed (heat lost to air).
-                packet.deactivate()
-                packets_convected += 1
-                continue  # Break the 'while' loop to move to the next packet.
-            # --- NEW CODE END ---
-            
-            # ... (Existing code for moving the packet) ...
-            # Check if packet should move based on move probability
-            if rng.random() < self.config.move_probability:
-                # Choose random direction
-                direction = rng.choice(self.grid.neighbor_directions)
-                new_x = packet.x + direction[0]
-                new_y = packet.y + direction[1]
-                
-                # Apply boundary conditions
-                if self._apply_boundary_condition(packet, new_x, new_y):
-                    packets_removed += 1
-                else:
-                    packet.move_to(new_x, new_y)
-        
-        # Clean up inactive packets
-        self.packet_manager.remove_inactive_packets()
+        n_active = self.packet_manager.count_active()
+        if n_active == 0:
+            return 0
+        
+        xs, ys = self.packet_manager.get_active_positions()
+        alive = self.packet_manager.alive[:n_active]
+        
+        # Per-packet move draws. Convection losses are independent Bernoulli
+        # trials, so draw their number once and then pick which packets they hit
+        rand_move = rng.random_array(n_active)
+        convection_prob = self.config.convection_prob_float32
+        if convection_prob > 0:
+            n_convected = rng.binomial(n_active, convection_prob)
+            conv_idx = rng.sample_indices(n_active, n_convected)
+        else:
+            conv_idx = self._no_convection
+        
+        # Convection check, move, boundaries and grid tally for every packet in one kernel call
+        packets_convected, packets_removed = step_kernel(
+            xs, ys, self._directions, self.grid.Nx, self.grid.Ny,
+            self.config.move_probability_float32, self._absorbing,
+            rand_move, conv_idx,
+            rng.random_bits_array(-(-n_active // DIRECTIONS_PER_WORD)), alive,
+            self.grid.cell_counts
+        )
+        self._field_current = True
+        
+        # Clean up convected and absorbed packets
+        self.packet_manager.retain(alive)
         self.total_packets_removed += packets_removed
         self.total_packets_convected += packets_convected
         
         return packets_removed + packets_convected
     
-    def _apply_boundary_condition(self, packet: HeatPacket, new_x: int, new_y: int) -> bool:
-        """Apply boundary condition. Returns True if packet was removed."""
-        if not self.grid.is_valid_position(new_x, new_y):
-            if self.config.boundary_type == "absorbing":
-                # Remove packet (absorbing boundary)
-                packet.deactivate()
-                return True
-            elif self.config.boundary_type == "reflecting":
-                # Keep packet at current position (reflecting boundary)
-                return False
-        return False
-    
     def update_temperature_field(self):
         """Update temperature field based on current packet positions."""
-        positions = self.packet_manager.get_active_positions()
-        self.grid.update_temperature_field(positions)
+        if self._field_current:
+            return  # Already tallied by the step kernel
+        xs, ys = self.packet_manager.get_active_positions()
+        self.grid.update_temperature_field(xs, ys)
+        self._field_current = True
     
-    def get_observables(self) -> dict:
-        """Get current observable quantities."""
+    def get_observables(self, include_field_stats: bool = True) -> dict:
+        """
+        Get current observable quantities.
+        
+        Args:
+            include_field_stats: Also compute the whole-field 'temperature_stats'
+                (skip on steps where only the scalar observables are needed)
+        """
         self.update_temperature_field()
         
-        return {
+        observables = {
             'active_packets': self.packet_manager.count_active(),
             'hotspot_temperature': self.grid.get_hotspot_temperature(),
-            'temperature_stats': self.grid.get_temperature_statistics(),
             'total_injected': self.total_packets_injected,
             'total_removed': self.total_packets_removed,
             'total_convected': self.total_packets_convected
         }
+        if include_field_stats:
+            observables['temperature_stats'] = self.grid.get_temperature_statistics()
+        return observables
     
     def get_temperature_field(self) -> np.ndarray:
         """Get current temperature field."""
         return self.grid.temperature_field.copy()
     
+    def set_config(self, config: SimulationConfig):
+        """Switch to a new configuration, keeping allocated packet storage.
+        
+        The grid is kept as well unless the geometry or hot-spot changes.
+        """
+        old = self.config
+        same_geometry = ((old.Nx, old.Ny, old.Lx, old.Ly, old.hotspot_center, old.hotspot_radius) ==
+                         (config.Nx, config.Ny, config.Lx, config.Ly, config.hotspot_center, config.hotspot_radius))
+        self.config = config
+        self._absorbing = config.boundary_type == "absorbing"
+        if same_geometry:
+            self.grid.config = config
+        else:
+            self.grid = Grid(config)
+            self._directions = self.grid.direction_vectors
+        self.reset()
+    
     def reset(self):
         """Reset heat sink to initial state."""
         self.packet_manager.clear_all()
         self.grid.reset()
+        self._field_current = False
         self.total_packets_injected = 0
         self.total_packets_removed = 0
         self.total_packets_convected = 0
@@ -200,6 +271,6 @@ class HeatSink:
             'grid': {
                 'size': (self.config.Nx, self.config.Ny),
                 'physical_size': (self.config.Lx, self.config.Ly),
-                'hotspot_cells': np.sum(self.grid.hotspot_mask)
+                'hotspot_cells': self.grid.n_hotspot_cells
             }
         }
\ No newline at end of file
@@ -7,45 +7,58 @@ import numpy as np
 from .config import SimulationConfig
 from .grid import Grid
 from .rng import RandomNumberGenerator
+from .kernels import slot_step_kernel, DIRECTIONS_PER_WORD
+
+
+# Random-walk step vectors, indexed by direction choice
+_DIRS = np.array([[0, 1], [0, -1], [1, 0], [-1, 0]], dtype=np.int8)
 
 
 class OptimizedPacketManager:
-    """High-performance packet manager using numpy arrays."""
+    """High-performance packet manager using numpy arrays.
+    
+    Slots are recycled through a stack of free slot indices, so adding and
+    removing packets never scans or compacts the position arrays.
+    """
     
     def __init__(self, max_packets: int = 100000):
         """Initialize with pre-allocated arrays for performance."""
         self.max_packets = max_packets
         
-        # Pre-allocate arrays
-        self.positions_x = np.full(max_packets, -1, dtype=np.int32)
-        self.positions_y = np.full(max_packets, -1, dtype=np.int32)
+        # Pre-allocate arrays (int16 coordinates: grids are far smaller than 32767 cells per side)
+        self.positions_x = np.full(max_packets, -1, dtype=np.int16)
+        self.positions_y = np.full(max_packets, -1, dtype=np.int16)
         self.active_mask = np.zeros(max_packets, dtype=bool)
         
+        # Free slots; the top of the stack is the end of the first _n_free entries
+        self._free_slots = np.empty(max_packets, dtype=np.int32)
+        self._n_free = 0
+        
         self.n_active = 0
-        self.next_slot = 0
+        self.clear_all()
     
-    def add_packets(self, positions: List[Tuple[int, int]]) -> int:
-        """Add multiple packets at once for better performance."""
-        n_to_add = len(positions)
+    def _push_free(self, slots: np.ndarray):
+        """Return slots to the free stack."""
+        n = len(slots)
+        self._free_slots[self._n_free:self._n_free + n] = slots
+        self._n_free += n
+        self.n_active -= n
+    
+    def add_packets(self, positions) -> int:
+        """Add multiple packets at once from a sequence or (n, 2) array of (x, y) positions."""
+        positions = np.asarray(positions, dtype=np.int32).reshape(-1, 2)
         
-        if self.n_active + n_to_add > self.max_packets:
-            # Compact arrays if needed
-            self._compact_arrays()
-            
-            if self.n_active + n_to_add > self.max_packets:
-                # Still too many - add what we can
-                n_to_add = self.max_packets - self.n_active
-                positions = positions[:n_to_add]
+        # Add what fits if the pool is full
+        n_to_add = min(len(positions), self._n_free)
         
-        # Find available slots
-        available_slots = np.where(~self.active_mask)[0][:n_to_add]
+        # Pop slots off the free stack
+        slots = self._free_slots[self._n_free - n_to_add:self._n_free][::-1]
+        self._n_free -= n_to_add
         
         # Add packets
-        for i, (x, y) in enumerate(positions):
-            slot = available_slots[i]
-            self.positions_x[slot] = x
-            self.positions_y[slot] = y
-            self.active_mask[slot] = True
+        self.positions_x[slots] = positions[:n_to_add, 0]
+        self.positions_y[slots] = positions[:n_to_add, 1]
+        self.active_mask[slots] = True
         
         self.n_active += n_to_add
         return n_to_add
@@ -68,10 +81,14 @@ class OptimizedPacketManager:
         remove_indices = active_indices[remove_mask]
         
         self.active_mask[remove_indices] = False
-        self.n_active -= len(remove_indices)
+        self._push_free(remove_indices)
         
         return len(remove_indices)
     
+    def release_deactivated(self, slots: np.ndarray):
+        """Free those of the given slots whose active flag was cleared externally (e.g. by a kernel)."""
+        self._push_free(slots[~self.active_mask[slots]])
+    
     def get_active_positions(self) -> Tuple[np.ndarray, np.ndarray]:
         """Get positions of all active packets as numpy arrays."""
         active_indices = np.where(self.active_mask)[0]
@@ -90,26 +107,10 @@ class OptimizedPacketManager:
         """Remove all packets."""
         self.active_mask.fill(False)
         self.n_active = 0
-        self.next_slot = 0
-    
-    def _compact_arrays(self):
-        """Compact arrays by moving active packets to beginning."""
-        active_indices = np.where(self.active_mask)[0]
-        
-        if len(active_indices) == 0:
-            self.clear_all()
-            return
-        
-        # Move active packets to beginning of arrays
-        self.positions_x[:len(active_indices)] = self.positions_x[active_indices]
-        self.positions_y[:len(active_indices)] = self.positions_y[active_indices]
         
-        # Update active mask
-        self.active_mask.fill(False)
-        self.active_mask[:len(active_indices)] = True
-        
-        self.n_active = len(active_indices)
-        self.next_slot = len(active_indices)
+        # Stack every slot, lowest index on top
+        self._free_slots[:] = np.arange(self.max_packets - 1, -1, -1, dtype=np.int32)
+        self._n_free = self.max_packets
 
 
 class OptimizedHeatSink:
@@ -123,135 +124,73 @@ class OptimizedHeatSink:
         max_packets = max(50000, config.N_packets * 10)  # Allow for growth
         self.packet_manager = OptimizedPacketManager(max_packets)
         
-        # Pre-allocate arrays for random walk
-        self._temp_arrays_allocated = False
+        # Boundary type as a flag for the step kernel (no string compare per step)
+        self._absorbing = config.boundary_type == "absorbing"
         
         # Statistics tracking
         self.total_packets_injected = 0
         self.total_packets_removed = 0
     
-    def _allocate_temp_arrays(self, size: int):
-        """Allocate temporary arrays for vectorized operations."""
-        self._move_decisions = np.zeros(size, dtype=bool)
-        self._direction_choices = np.zeros(size, dtype=np.int32)
-        self._new_x = np.zeros(size, dtype=np.int32)
-        self._new_y = np.zeros(size, dtype=np.int32)
-        self._boundary_hits = np.zeros(size, dtype=bool)
-        self._temp_arrays_allocated = True
-    
     def inject_heat_packets(self, rng: RandomNumberGenerator) -> int:
         """Inject new heat packets into hot-spot region."""
         packets_to_inject = self.config.Q
         
         # Generate all positions at once
-        positions = []
-        for _ in range(packets_to_inject):
-            x, y = self.grid.get_random_hotspot_position(rng)
-            positions.append((x, y))
+        xs, ys = self.grid.get_random_hotspot_positions(rng, packets_to_inject)
         
         # Add packets in batch
-        injected_count = self.packet_manager.add_packets(positions)
+        injected_count = self.packet_manager.add_packets(np.column_stack((xs, ys)))
         self.total_packets_injected += injected_count
         
         return injected_count
     
     def move_packets(self, rng: RandomNumberGenerator) -> int:
-        """Vectorized random walk update for all active packets."""
+        """Random walk update for all active packets (see kernels.slot_step_kernel)."""
         n_active = self.packet_manager.count_active()
         
         if n_active == 0:
             return 0
         
-        # Allocate temporary arrays if needed
-        if not self._temp_arrays_allocated or len(self._move_decisions) < n_active:
-            self._allocate_temp_arrays(max(n_active, 10000))
-        
-        # Get current positions
-        current_x, current_y = self.packet_manager.get_active_positions()
-        
-        # Vectorized move decisions
-        move_probs = np.array([rng.random() for _ in range(n_active)])
-        move_mask = move_probs < self.config.move_probability
-        n_moving = np.sum(move_mask)
-        
-        if n_moving == 0:
-            return 0
-        
-        # Vectorized direction choices for moving packets
-        direction_indices = np.array([rng.randint(0, 4) for _ in range(n_moving)])
-        
-        # Calculate new positions
-        directions = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)])
-        dx = directions[direction_indices, 0]
-        dy = directions[direction_indices, 1]
-        
-        new_x_moving = current_x[move_mask] + dx
-        new_y_moving = current_y[move_mask] + dy
-        
-        # Check boundary conditions
-        boundary_hits = ((new_x_moving < 0) | (new_x_moving >= self.grid.Nx) |
-                        (new_y_moving < 0) | (new_y_moving >= self.grid.Ny))
-        
-        packets_removed = 0
-        
-        if self.config.boundary_type == "absorbing":
-            # Remove packets that hit boundaries
-            packets_removed = np.sum(boundary_hits)
-            
-            # Create removal mask for all active packets
-            remove_mask_all = np.zeros(n_active, dtype=bool)
-            remove_mask_all[move_mask] = boundary_hits
-            
-            # Remove boundary-hitting packets
-            if packets_removed > 0:
-                self.packet_manager.remove_packets(remove_mask_all)
-            
-            # Move remaining packets
-            valid_moves = move_mask.copy()
-            valid_moves[move_mask] &= ~boundary_hits
-            
-            if np.any(valid_moves):
-                # Update positions for valid moves
-                new_x_all = current_x.copy()
-                new_y_all = current_y.copy()
-                
-                valid_moving_mask = ~boundary_hits
-                new_x_all[move_mask] = np.where(valid_moving_mask, new_x_moving, current_x[move_mask])
-                new_y_all[move_mask] = np.where(valid_moving_mask, new_y_moving, current_y[move_mask])
-                
-                self.packet_manager.move_packets(valid_moves, new_x_all, new_y_all)
-        
-        elif self.config.boundary_type == "reflecting":
-            # Keep packets at current position if they would hit boundary
-            new_x_all = current_x.copy()
-            new_y_all = current_y.copy()
-            
-            # Only update positions for valid moves
-            valid_moves = ~boundary_hits
-            new_x_all[move_mask] = np.where(valid_moves, new_x_moving, current_x[move_mask])
-            new_y_all[move_mask] = np.where(valid_moves, new_y_moving, current_y[move_mask])
-            
-            self.packet_manager.move_packets(move_mask, new_x_all, new_y_all)
+        # One bulk draw per quantity, then move, boundary check and removal
+        # for every active slot in one kernel call
+        slots = np.flatnonzero(self.packet_manager.active_mask)
+        packets_removed = slot_step_kernel(
+            self.packet_manager.positions_x, self.packet_manager.positions_y,
+            self.packet_manager.active_mask, slots,
+            _DIRS, self.grid.Nx, self.grid.Ny,
+            self.config.move_probability_float32, self._absorbing,
+            rng.random_array(n_active), rng.random_bits_array(-(-n_active // DIRECTIONS_PER_WORD))
+        )
+        if packets_removed > 0:
+            self.packet_manager.release_deactivated(slots)
         
         self.total_packets_removed += packets_removed
         return packets_removed
     
     def update_temperature_field(self):
         """Update temperature field based on current packet positions."""
-        positions = self.packet_manager.get_active_positions_list()
-        self.grid.update_temperature_field(positions)
+        x_pos, y_pos = self.packet_manager.get_active_positions()
+        self.grid.update_temperature_field(x_pos, y_pos)
     
-    def get_observables(self) -> dict:
-        """Get current observable quantities."""
+    def get_observables(self, include_field_stats: bool = True) -> dict:
+        """
+        Get current observable quantities.
+        
+        Args:
+            include_field_stats: Also compute the whole-field 'temperature_stats'
+                (skip on steps where only the scalar observables are needed)
+        """
         self.update_temperature_field()
         
-        return {
+        observables = {
             'active_packets': self.packet_manager.count_active(),
             'hotspot_temperature': self.grid.get_hotspot_temperature(),
-            'temperature_stats': self.grid.get_temperature_statistics(),
             'total_injected': self.total_packets_injected,
             'total_removed': self.total_packets_removed
         }
+        if include_field_stats:
+            observables['temperature_stats'] = self.grid.get_temperature_statistics()
+        return observables
     
     def get_temperature_field(self) -> np.ndarray:
         """Get current temperature field."""
@@ -278,6 +217,6 @@ class OptimizedHeatSink:
             'grid': {
                 'size': (self.config.Nx, self.config.Ny),
                 'physical_size': (self.config.Lx, self.config.Ly),
-                'hotspot_cells': np.sum(self.grid.hotspot_mask)
+                'hotspot_cells': self.grid.n_hotspot_cells
             }
         }
\ No newline at end of file
@@ -19,76 +19,130 @@ class ObservableCollector:
         self.config = config
         self.reset()
     
+    # Scalar time series recorded at every collection step: attribute -> dtype
+    _SERIES = {
+        'steps': np.int32,
+        'times': np.float32,
+        'hotspot_temperature': np.float32,
+        'active_packets': np.int32,
+        'temp_mean': np.float32,
+        'temp_std': np.float32,
+        'temp_max': np.float32,
+        'temp_min': np.float32,
+    }
+    
+    # Cumulative packet counters, stored together as the columns of packet_counts
+    # (one contiguous row per collection step) and exposed as column views
+    _COUNTERS = ('total_injected', 'total_removed', 'total_convected')  # + convection losses
+    
     def reset(self):
         """Reset all collected data."""
-        # Time series data
-        self.steps: List[int] = []
-        self.times: List[float] = []
-        
-        # Primary observables
-        self.hotspot_temperature: List[float] = []
-        self.active_packets: List[int] = []
-        
-        # Temperature field statistics
-        self.temp_mean: List[float] = []
-        self.temp_std: List[float] = []
-        self.temp_max: List[float] = []
-        self.temp_min: List[float] = []
-        
-        # Packet statistics
-        self.total_injected: List[int] = []
-        self.total_removed: List[int] = []
-        self.total_convected: List[int] = []  # Track convection losses
-        
-        # Temperature field snapshots (if enabled)
-        self.temperature_snapshots: List[np.ndarray] = []
-        self.snapshot_times: List[float] = []
+        # Pre-size the time series for one full run; collect() grows them if a
+        # run goes past n_steps (e.g. run_until_condition with max_steps)
+        n_out = self.config.n_steps // self.config.output_interval + 1
+        for name, dtype in self._SERIES.items():
+            setattr(self, name, np.empty(n_out, dtype=dtype))
+        self.packet_counts = np.empty((n_out, len(self._COUNTERS)), dtype=np.int32)
+        self._bind_counters()
+        self._i = 0
+        
+        # Temperature field snapshots (if enabled), one (Nx, Ny) slab per
+        # snapshot_stride collection steps in a single preallocated block
+        n_snap = (n_out - 1) // self.config.snapshot_stride + 1 if self.config.save_snapshots else 0
+        self.temperature_snapshots = np.empty((n_snap, self.config.Nx, self.config.Ny), dtype=np.int32)
+        self.snapshot_times = np.empty(n_snap, dtype=np.float32)
+        self._n_snap = 0
+    
+    def _grow(self):
+        """Double the capacity of every time series array."""
+        for name in self._SERIES:
+            old = getattr(self, name)
+            grown = np.empty(max(2 * len(old), 1), dtype=old.dtype)
+            grown[:self._i] = old[:self._i]
+            setattr(self, name, grown)
+        
+        grown = np.empty((len(self.times), len(self._COUNTERS)), dtype=np.int32)
+        grown[:self._i] = self.packet_counts[:self._i]
+        self.packet_counts = grown
+        self._bind_counters()
+    
+    def _grow_snapshots(self):
+        """Double the capacity of the snapshot block."""
+        n_snap = max(2 * len(self.snapshot_times), 1)
+        grown = np.empty((n_snap,) + self.temperature_snapshots.shape[1:], dtype=np.int32)
+        grown[:self._n_snap] = self.temperature_snapshots[:self._n_snap]
+        self.temperature_snapshots = grown
+        grown = np.empty(n_snap, dtype=np.float32)
+        grown[:self._n_snap] = self.snapshot_times[:self._n_snap]
+        self.snapshot_times = grown
+    
+    def _bind_counters(self):
+        """Point the per-counter attributes at the columns of packet_counts."""
+        for column, name in enumerate(self._COUNTERS):
+            setattr(self, name, self.packet_counts[:, column])
     
     def collect(self, step: int, time: float, observables: Dict, 
                 temperature_field: Optional[np.ndarray] = None):
         """Collect observables at current time step."""
+        if self._i == len(self.times):
+            self._grow()
+        i = self._i
         
         # Basic time information
-        self.steps.append(step)
-        self.times.append(time)
+        self.steps[i] = step
+        self.times[i] = time
         
         # Primary observables
-        self.hotspot_temperature.append(observables['hotspot_temperature'])
-        self.active_packets.append(observables['active_packets'])
+        self.hotspot_temperature[i] = observables['hotspot_temperature']
+        self.active_packets[i] = observables['active_packets']
         
         # Temperature statistics
         temp_stats = observables['temperature_stats']
-        self.temp_mean.append(temp_stats['mean'])
-        self.temp_std.append(temp_stats['std'])
-        self.temp_max.append(temp_stats['max'])
-        self.temp_min.append(temp_stats['min'])
+        self.temp_mean[i] = temp_stats['mean']
+        self.temp_std[i] = temp_stats['std']
+        self.temp_max[i] = temp_stats['max']
+        self.temp_min[i] = temp_stats['min']
         
-        # Packet statistics
-        self.total_injected.append(observables['total_injected'])
-        self.total_removed.append(observables['total_removed'])
-        self.total_convected.append(observables.get('total_convected', 0))  # Handle missing key gracefully
+        # Packet statistics (one row write for all three counters)
+        self.packet_counts[i] = (observables['total_injected'],
+                                 observables['total_removed'],
+                                 observables.get('total_convected', 0))  # Handle missing key gracefully
+        self._i += 1
         
         # Temperature field snapshots
         if temperature_field is not None:
-            self.temperature_snapshots.append(temperature_field.copy())
-            self.snapshot_times.append(time)
+            if self._n_snap == len(self.snapshot_times):
+                self._grow_snapshots()
+            self.temperature_snapshots[self._n_snap] = temperature_field
+            self.snapshot_times[self._n_snap] = time
+            self._n_snap += 1
+    
+    def finalize(self):
+        """Truncate the time series arrays to the number of collected points."""
+        for name in self._SERIES:
+            setattr(self, name, getattr(self, name)[:self._i].copy())
+        self.packet_counts = self.packet_counts[:self._i].copy()
+        self._bind_counters()
+        self.temperature_snapshots = self.temperature_snapshots[:self._n_snap].copy()
+        self.snapshot_times = self.snapshot_times[:self._n_snap].copy()
     
     def get_data(self) -> Dict:
-        """Get all collected data as dictionary."""
+        """Get all collected data as dictionary (time series as array views)."""
+        n = self._i
         return {
-            'steps': self.steps,
-            'time': self.times,
-            'hotspot_temperature': self.hotspot_temperature,
-            'active_packets': self.active_packets,
-            'temperature_mean': self.temp_mean,
-            'temperature_std': self.temp_std,
-            'temperature_max': self.temp_max,
-            'temperature_min': self.temp_min,
-            'total_injected': self.total_injected,
-            'total_removed': self.total_removed,
-            'total_convected': self.total_convected,
-            'temperature_snapshots': self.temperature_snapshots,
-            'snapshot_times': self.snapshot_times
+            'steps': self.steps[:n],
+            'time': self.times[:n],
+            'hotspot_temperature': self.hotspot_temperature[:n],
+            'active_packets': self.active_packets[:n],
+            'temperature_mean': self.temp_mean[:n],
+            'temperature_std': self.temp_std[:n],
+            'temperature_max': self.temp_max[:n],
+            'temperature_min': self.temp_min[:n],
+            'total_injected': self.total_injected[:n],
+            'total_removed': self.total_removed[:n],
+            'total_convected': self.total_convected[:n],
+            'temperature_snapshots': self.temperature_snapshots[:self._n_snap],
+            'snapshot_times': self.snapshot_times[:self._n_snap]
         }
     
     def get_arrays(self) -> Dict[str, np.ndarray]:
@@ -101,14 +155,14 @@ class ObservableCollector:
                 arrays[key] = np.array(values)
         
         # Handle temperature snapshots separately
-        if self.temperature_snapshots:
-            arrays['temperature_snapshots'] = np.array(self.temperature_snapshots)
+        if self._n_snap > 0:
+            arrays['temperature_snapshots'] = np.array(data['temperature_snapshots'])
         
         return arrays
     
     def calculate_derived_observables(self) -> Dict:
         """Calculate derived observables from collected data."""
-        if not self.times:
+        if self._i == 0:
             return {}
         
         arrays = self.get_arrays()
@@ -179,28 +233,22 @@ class ObservableCollector:
         post_peak_temps = temperatures[max_idx:]
         post_peak_times = times[max_idx:]
         
-        cooling_times = {}
-        
-        # Different cooling thresholds
-        thresholds = {
-            'e_fold': max_temp / np.e,  # 1/e cooling time
-            'half_life': max_temp / 2,   # Half-life
-            'quarter': max_temp / 4,     # Quarter temperature
-            'ten_percent': max_temp * 0.1  # 10% of peak
-        }
+        # Different cooling thresholds: 1/e cooling time, half-life, quarter
+        # temperature and 10% of peak
+        names = ('e_fold', 'half_life', 'quarter', 'ten_percent')
+        thresholds = np.array([max_temp / np.e, max_temp / 2, max_temp / 4, max_temp * 0.1])
         
-        for name, threshold in thresholds.items():
-            below_threshold = post_peak_temps <= threshold
-            if np.any(below_threshold):
-                cooling_idx = np.where(below_threshold)[0][0]
-                cooling_time = post_peak_times[cooling_idx] - max_time
-                cooling_times[f'{name}_time'] = cooling_time
+        # First post-peak crossing of every threshold in one pass
+        below_threshold = post_peak_temps[None, :] <= thresholds[:, None]
+        cooling_idx = np.argmax(below_threshold, axis=1)
+        reached = below_threshold[np.arange(len(names)), cooling_idx]
+        cooling_time = post_peak_times[cooling_idx] - max_time
         
-        return cooling_times
+        return {f'{name}_time': t for name, t, hit in zip(names, cooling_time, reached) if hit}
     
     def get_summary_statistics(self) -> Dict:
         """Get summary statistics of all observables."""
-        if not self.times:
+        if self._i == 0:
             return {}
         
         arrays = self.get_arrays()
@@ -240,19 +288,9 @@ class ObservableCollector:
             import pandas as pd
             
             # Create DataFrame with time series data
-            df_data = {
-                'step': self.steps,
-                'time': self.times,
-                'hotspot_temperature': self.hotspot_temperature,
-                'active_packets': self.active_packets,
-                'temperature_mean': self.temp_mean,
-                'temperature_std': self.temp_std,
-                'temperature_max': self.temp_max,
-                'temperature_min': self.temp_min,
-                'total_injected': self.total_injected,
-                'total_removed': self.total_removed,
-                'total_convected': self.total_convected
-            }
+            df_data = {'step': data['steps']}
+            df_data.update({key: values for key, values in data.items()
+                            if key not in ['steps', 'temperature_snapshots', 'snapshot_times']})
             
             df = pd.DataFrame(df_data)
             df.to_csv(filename, index=False)
@@ -265,23 +303,30 @@ class ObservableCollector:
         if format == 'npz':
             loaded = np.load(filename)
             
-            # Restore lists from arrays
-            self.steps = loaded['steps'].tolist()
-            self.times = loaded['time'].tolist()
-            self.hotspot_temperature = loaded['hotspot_temperature'].tolist()
-            self.active_packets = loaded['active_packets'].tolist()
-            self.temp_mean = loaded['temperature_mean'].tolist()
-            self.temp_std = loaded['temperature_std'].tolist()
-            self.temp_max = loaded['temperature_max'].tolist()
-            self.temp_min = loaded['temperature_min'].tolist()
-            self.total_injected = loaded['total_injected'].tolist()
-            self.total_removed = loaded['total_removed'].tolist()
-            self.total_convected = loaded.get('total_convected', []).tolist()  # Handle missing key
+            # Restore time series arrays
+            self.steps = loaded['steps']
+            self.times = loaded['time']
+            self.hotspot_temperature = loaded['hotspot_temperature']
+            self.active_packets = loaded['active_packets']
+            self.temp_mean = loaded['temperature_mean']
+            self.temp_std = loaded['temperature_std']
+            self.temp_max = loaded['temperature_max']
+            self.temp_min = loaded['temperature_min']
+            self.packet_counts = np.empty((len(self.times), len(self._COUNTERS)), dtype=np.int32)
+            self.packet_counts[:, 0] = loaded['total_injected']
+            self.packet_counts[:, 1] = loaded['total_removed']
+            if 'total_convected' in loaded:
+                self.packet_counts[:, 2] = loaded['total_convected']
+            else:  # Handle missing key
+                self.packet_counts[:, 2] = 0
+            self._bind_counters()
+            self._i = len(self.times)
             
             # Handle snapshots if present
             if 'temperature_snapshots' in loaded:
-                self.temperature_snapshots = [snap for snap in loaded['temperature_snapshots']]
-                self.snapshot_times = loaded['snapshot_times'].tolist()
+                self.temperature_snapshots = loaded['temperature_snapshots']
+                self.snapshot_times = loaded['snapshot_times']
+                self._n_snap = len(self.snapshot_times)
         
         else:
             raise ValueError(f"Unsupported load format: {format}")
\ No newline at end of file
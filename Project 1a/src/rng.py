@@ -3,17 +3,42 @@ Random number generation utilities for Monte Carlo simulation.
 """
 
 import numpy as np
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Union
+
+# An integer seed or a SeedSequence (e.g. a child from SeedSequence.spawn)
+Seed = Union[int, np.random.SeedSequence]
+
+
+def _make_generator(seed: Optional[Seed]) -> np.random.Generator:
+    """Create a Generator backed by SFC64, which is cheaper per value than the default PCG64."""
+    return np.random.Generator(np.random.SFC64(seed))
 
 
 class RandomNumberGenerator:
     """Manages random number generation for the simulation."""
     
-    def __init__(self, seed: Optional[int] = None):
-        """Initialize random number generator with optional seed."""
+    def __init__(self, seed: Optional[Seed] = None, buffer_size: int = 1 << 18):
+        """Initialize random number generator with optional seed.
+        
+        Args:
+            seed: Seed for reproducibility
+            buffer_size: Number of values pre-generated per refill for array draws
+        """
         self.seed = seed
-        self.rng = np.random.RandomState(seed)
+        self.rng = _make_generator(seed)
         self._call_count = 0
+        self.buffer_size = buffer_size
+        self._clear_buffers()
+    
+    def _clear_buffers(self):
+        """Discard pre-generated values so the next array draw refills."""
+        self._uniform_buffer = np.empty(0, dtype=np.float32)
+        self._uniform_pos = 0
+        self._int_buffer = np.empty(0, dtype=np.int8)
+        self._int_pos = 0
+        self._int_bounds = None
+        self._bits_buffer = np.empty(0, dtype=np.uint64)
+        self._bits_pos = 0
     
     def uniform(self, low: float = 0.0, high: float = 1.0) -> float:
         """Generate uniform random number."""
@@ -23,17 +48,84 @@ class RandomNumberGenerator:
     def choice(self, options: List) -> any:
         """Choose random element from list."""
         self._call_count += 1
-        return options[self.rng.randint(0, len(options))]
+        return options[self.rng.integers(0, len(options))]
+    
+    def random(self, size: Optional[int] = None):
+        """Generate random number(s) in [0, 1)."""
+        self._call_count += 1
+        return self.rng.random(size)
     
-    def random(self) -> float:
-        """Generate random number in [0, 1)."""
+    def randint(self, low: int, high: int, size: Optional[int] = None):
+        """Generate random integer(s) in [low, high)."""
+        self._call_count += 1
+        return self.rng.integers(low, high, size)
+    
+    def random_array(self, n: int) -> np.ndarray:
+        """
+        Get n uniform random numbers in [0, 1) as float32.
+        
+        Values are served from a pre-filled buffer that is refilled in one call
+        when exhausted, amortizing generator overhead across many time steps.
+        The returned array is a view that is only valid until the next draw.
+        """
+        self._call_count += 1
+        if self._uniform_pos + n > len(self._uniform_buffer):
+            size = max(n, self.buffer_size)
+            self._uniform_buffer = self.rng.random(size, dtype=np.float32)
+            self._uniform_pos = 0
+        
+        start = self._uniform_pos
+        self._uniform_pos += n
+        return self._uniform_buffer[start:self._uniform_pos]
+    
+    def randint_array(self, low: int, high: int, n: int) -> np.ndarray:
+        """
+        Get n random integers in [low, high) from a pre-filled buffer.
+        
+        The buffer uses int8 when the range fits (e.g. direction choices) and
+        int32 otherwise.
+        
+        Like random_array(), the returned view is only valid until the next draw.
+        """
+        self._call_count += 1
+        if self._int_bounds != (low, high) or self._int_pos + n > len(self._int_buffer):
+            size = max(n, self.buffer_size)
+            dtype = np.int8 if -128 <= low and high <= 128 else np.int32
+            self._int_buffer = self.rng.integers(low, high, size, dtype=dtype)
+            self._int_pos = 0
+            self._int_bounds = (low, high)
+        
+        start = self._int_pos
+        self._int_pos += n
+        return self._int_buffer[start:self._int_pos]
+    
+    def random_bits_array(self, n_words: int) -> np.ndarray:
+        """
+        Get n_words uniformly random 64-bit words from a pre-filled buffer.
+        
+        Each word packs many small draws, e.g. 32 two-bit direction choices,
+        so one generator value serves 32 packets. Like random_array(), the
+        returned view is only valid until the next draw.
+        """
+        self._call_count += 1
+        if self._bits_pos + n_words > len(self._bits_buffer):
+            size = max(n_words, self.buffer_size // 32)
+            self._bits_buffer = self.rng.bit_generator.random_raw(size)
+            self._bits_pos = 0
+        
+        start = self._bits_pos
+        self._bits_pos += n_words
+        return self._bits_buffer[start:self._bits_pos]
+    
+    def binomial(self, n: int, p: float) -> int:
+        """Generate the number of successes in n Bernoulli(p) trials."""
         self._call_count += 1
-        return self.rng.random()
+        return int(self.rng.binomial(n, p))
     
-    def randint(self, low: int, high: int) -> int:
-        """Generate random integer in [low, high)."""
+    def sample_indices(self, n: int, k: int) -> np.ndarray:
+        """Get k distinct random indices in [0, n), in no particular order."""
         self._call_count += 1
-        return self.rng.randint(low, high)
+        return self.rng.choice(n, k, replace=False, shuffle=False)
     
     def normal(self, mean: float = 0.0, std: float = 1.0) -> float:
         """Generate normal random number."""
@@ -50,21 +142,23 @@ class RandomNumberGenerator:
         return {
             'seed': self.seed,
             'call_count': self._call_count,
-            'state': self.rng.get_state()
+            'state': self.rng.bit_generator.state
         }
     
     def set_state(self, state: dict):
         """Set state of random number generator."""
         self.seed = state['seed']
         self._call_count = state['call_count']
-        self.rng.set_state(state['state'])
+        self.rng.bit_generator.state = state['state']
+        self._clear_buffers()
     
-    def reset(self, seed: Optional[int] = None):
+    def reset(self, seed: Optional[Seed] = None):
         """Reset random number generator."""
         if seed is not None:
             self.seed = seed
-        self.rng = np.random.RandomState(self.seed)
+        self.rng = _make_generator(self.seed)
         self._call_count = 0
+        self._clear_buffers()
 
 
 class ReproducibleRNG:
@@ -73,9 +167,20 @@ class ReproducibleRNG:
     def __init__(self, base_seed: int = 42):
         """Initialize with base seed for reproducibility."""
         self.base_seed = base_seed
-        self.simulation_rng = RandomNumberGenerator(base_seed)
-        self.packet_rng = RandomNumberGenerator(base_seed + 1)
-        self.injection_rng = RandomNumberGenerator(base_seed + 2)
+        simulation_seed, packet_seed, injection_seed = self._stream_seeds()
+        self.simulation_rng = RandomNumberGenerator(simulation_seed)
+        self.packet_rng = RandomNumberGenerator(packet_seed)
+        self.injection_rng = RandomNumberGenerator(injection_seed)
+    
+    def _stream_seeds(self) -> List[np.random.SeedSequence]:
+        """
+        Derive independent seeds for the simulation, packet and injection streams.
+        
+        The streams are SeedSequence children of base_seed rather than
+        base_seed, base_seed + 1, base_seed + 2, so runs with nearby base seeds
+        (e.g. one per realization) never share a stream.
+        """
+        return np.random.SeedSequence(self.base_seed).spawn(3)
     
     def get_simulation_rng(self) -> RandomNumberGenerator:
         """Get RNG for general simulation use."""
@@ -91,9 +196,10 @@ class ReproducibleRNG:
     
     def reset_all(self):
         """Reset all random number generators."""
-        self.simulation_rng.reset(self.base_seed)
-        self.packet_rng.reset(self.base_seed + 1)
-        self.injection_rng.reset(self.base_seed + 2)
+        simulation_seed, packet_seed, injection_seed = self._stream_seeds()
+        self.simulation_rng.reset(simulation_seed)
+        self.packet_rng.reset(packet_seed)
+        self.injection_rng.reset(injection_seed)
     
     def get_state_summary(self) -> dict:
         """Get summary of all RNG states."""
@@ -2,8 +2,14 @@
 Main Monte Carlo simulation engine.
 """
 
+import dataclasses
+import hashlib
+import multiprocessing as mp
+import os
+import pickle
 import time
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
 import numpy as np
 
 try:
@@ -34,6 +40,34 @@ class MonteCarloSimulator:
         self.is_running = False
         self.start_time = None
         self.end_time = None
+        self.stopped_early = False
+    
+    def reset(self, config: Optional[SimulationConfig] = None, **overrides):
+        """
+        Reuse this simulator for a new configuration, e.g. the next point of a sweep.
+        
+        Packet storage and the grid are cleared in place rather than reallocated.
+        
+        Args:
+            config: New configuration (default: keep the current one)
+            **overrides: Configuration fields to change, e.g. convection_prob=0.01;
+                derived values such as n_steps are recomputed
+        """
+        if config is None:
+            config = self.config
+        if overrides:
+            config = dataclasses.replace(config, **overrides)
+        
+        self.config = config
+        self.heat_sink.set_config(config)
+        self.rng_manager.base_seed = config.random_seed or 42
+        self.observable_collector.config = config
+        
+        self.current_step = 0
+        self.current_time = 0.0
+        self.is_running = False
+        self.start_time = None
+        self.end_time = None
     
     def initialize(self):
         """Initialize simulation to starting state."""
@@ -47,6 +81,7 @@ class MonteCarloSimulator:
         self.current_step = 0
         self.current_time = 0.0
         self.is_running = False
+        self.stopped_early = False
         
         print(f"Simulation initialized:")
         print(f"  {self.config}")
@@ -58,9 +93,8 @@ class MonteCarloSimulator:
         # Add initial packets to establish baseline temperature
         initial_packets = max(1, int(self.config.N_packets * 0.1))  # 10% of total packets
         
-        for _ in range(initial_packets):
-            x, y = self.heat_sink.grid.get_random_hotspot_position(injection_rng)
-            self.heat_sink.packet_manager.add_packet(x, y)
+        xs, ys = self.heat_sink.grid.get_random_hotspot_positions(injection_rng, initial_packets)
+        self.heat_sink.packet_manager.add_packets(xs, ys)
         
         print(f"Seeded {initial_packets} initial packets in hotspot")
     
@@ -81,16 +115,19 @@ class MonteCarloSimulator:
         
         # Step 4c: Apply boundary conditions (handled in move_packets)
         
-        # Step 4d: Record observables
-        observables = self.heat_sink.get_observables()
+        # Step 4d: Record observables (whole-field statistics only on collection steps)
+        collecting = self.current_step % self.config.output_interval == 0
+        observables = self.heat_sink.get_observables(include_field_stats=collecting)
         
-        # Collect data if needed
-        if self.current_step % self.config.output_interval == 0:
+        # Collect data if needed (with a field snapshot every snapshot_stride collections)
+        if collecting:
+            take_snapshot = (self.config.save_snapshots and
+                             self.current_step % (self.config.output_interval * self.config.snapshot_stride) == 0)
             self.observable_collector.collect(
                 step=self.current_step,
                 time=self.current_time,
                 observables=observables,
-                temperature_field=self.heat_sink.get_temperature_field() if self.config.save_snapshots else None
+                temperature_field=self.heat_sink.grid.temperature_field if take_snapshot else None
             )
         
         # Update simulation state
@@ -115,6 +152,10 @@ class MonteCarloSimulator:
         self.start_time = time.time()
         self.is_running = True
         
+        # Running sums of the hotspot temperature, for the early-stop window means
+        if self.config.early_stop:
+            temp_sums = np.zeros(self.config.n_steps + 1)
+        
         try:
             # Main simulation loop
             for step in range(self.config.n_steps):
@@ -125,6 +166,13 @@ class MonteCarloSimulator:
                     progress_callback(step_result)
                 elif step % (self.config.n_steps // 10) == 0:
                     self._default_progress_report(step_result)
+                
+                if self.config.early_stop:
+                    temp_sums[step + 1] = temp_sums[step] + step_result['hotspot_temp']
+                    if self._reached_steady_state(temp_sums, step + 1):
+                        print(f"Steady state reached at step {self.current_step}, stopping early")
+                        self.stopped_early = True
+                        break
             
             self.is_running = False
             self.end_time = time.time()
@@ -145,6 +193,25 @@ class MonteCarloSimulator:
             self.is_running = False
             raise
     
+    def _reached_steady_state(self, temp_sums: np.ndarray, n: int) -> bool:
+        """
+        Check whether the hotspot temperature has stopped drifting.
+        
+        Compares the mean hotspot temperature over the last early_stop_window
+        steps with the mean over the window before it.
+        
+        Args:
+            temp_sums: Cumulative sums of the per-step hotspot temperature
+            n: Number of steps taken so far
+        """
+        window = self.config.early_stop_window
+        if n < 2 * window:
+            return False
+        
+        last_mean = (temp_sums[n] - temp_sums[n - window]) / window
+        previous_mean = (temp_sums[n - window] - temp_sums[n - 2 * window]) / window
+        return abs(last_mean - previous_mean) <= self.config.early_stop_tolerance * last_mean
+    
     def run_until_condition(self, condition_func: callable, max_steps: Optional[int] = None) -> Dict:
         """Run simulation until specified condition is met."""
         self.initialize()
@@ -188,6 +255,7 @@ class MonteCarloSimulator:
     
     def _compile_results(self) -> Dict:
         """Compile final simulation results."""
+        self.observable_collector.finalize()
         data = self.observable_collector.get_data()
         
         # Calculate performance metrics
@@ -202,6 +270,7 @@ class MonteCarloSimulator:
             'metrics': metrics,
             'metadata': {
                 'completed_steps': self.current_step,
+                'stopped_early': self.stopped_early,
                 'final_time': self.current_time,
                 'runtime_seconds': runtime,
                 'rng_state': self.rng_manager.get_state_summary(),
@@ -211,7 +280,7 @@ class MonteCarloSimulator:
     
     def _calculate_performance_metrics(self, data: Dict) -> Dict:
         """Calculate heat sink performance metrics."""
-        if not data['hotspot_temperature']:
+        if len(data['hotspot_temperature']) == 0:
             return {}
         
         hotspot_temps = np.array(data['hotspot_temperature'])
@@ -237,7 +306,7 @@ class MonteCarloSimulator:
                 cooling_time = post_max_times[cooling_idx] - post_max_times[0]
         
         # Spatial uniformity (from final temperature field)
-        final_temp_field = data['temperature_snapshots'][-1] if data['temperature_snapshots'] else None
+        final_temp_field = data['temperature_snapshots'][-1] if len(data['temperature_snapshots']) > 0 else None
         spatial_uniformity = np.std(final_temp_field) if final_temp_field is not None else None
         
         # Steady-state analysis (last 20% of simulation)
@@ -253,7 +322,7 @@ class MonteCarloSimulator:
             'spatial_uniformity': spatial_uniformity,
             'steady_state_temperature': steady_state_temp,
             'steady_state_fluctuation': steady_state_std,
-            'final_active_packets': data['active_packets'][-1] if data['active_packets'] else 0
+            'final_active_packets': data['active_packets'][-1] if len(data['active_packets']) > 0 else 0
         }
     
     def _print_final_summary(self, results: Dict):
@@ -282,4 +351,144 @@ class MonteCarloSimulator:
             'time': self.current_time,
             'is_running': self.is_running,
             'observables': self.heat_sink.get_observables() if self.is_running else None
-        }
\ No newline at end of file
+        }
+
+
+# On-disk result cache used by run_cached() (Project 1a/outputs/.sim_cache)
+SIM_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "outputs", ".sim_cache")
+
+# Modules whose source determines simulation results; editing any of them
+# invalidates every cached result
+_SIMULATION_SOURCES = ('config.py', 'grid.py', 'kernels.py', 'model.py',
+                       'observables.py', 'rng.py', 'simulate.py')
+
+
+@lru_cache(maxsize=1)
+def _source_version() -> str:
+    """Hash of the simulation source files."""
+    digest = hashlib.blake2b(digest_size=16)
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in _SIMULATION_SOURCES:
+        with open(os.path.join(src_dir, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def run_cached(config: SimulationConfig, cache_dir: str = SIM_CACHE_DIR,
+               simulator: Optional[MonteCarloSimulator] = None,
+               use_cache: bool = False) -> Dict:
+    """
+    Run a simulation, optionally reusing the stored result of an identical earlier run.
+    
+    Results are keyed on every effective configuration value (config.to_dict(),
+    which includes derived values such as n_steps) plus the simulation source,
+    so they are only reused when the run would be reproduced exactly. Unseeded
+    configs (random_seed=None) are never cached. Entries are never evicted
+    either, and editing a simulation source file orphans the old ones, so
+    delete cache_dir (outputs/.sim_cache) to clear it. Do not use the cache
+    when timing simulations.
+    
+    Args:
+        config: Simulation configuration
+        cache_dir: Directory holding pickled results
+        simulator: Existing simulator to reset and reuse on a cache miss
+            (default: construct a new one)
+        use_cache: Load and store results in cache_dir (default: just run)
+        
+    Returns:
+        Results dictionary as returned by MonteCarloSimulator.run()
+    """
+    path = None
+    if use_cache and config.random_seed is not None:
+        key_data = repr((config.to_dict(), _source_version())).encode()
+        key = hashlib.blake2b(key_data, digest_size=16).hexdigest()
+        path = os.path.join(cache_dir, f"{key}.pkl")
+        
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+    
+    if simulator is None:
+        simulator = MonteCarloSimulator(config)
+    else:
+        simulator.reset(config)
+    result = simulator.run()
+    
+    # Only store complete runs (run() also returns partial results on Ctrl-C)
+    metadata = result['metadata']
+    if path is not None and (metadata['completed_steps'] >= config.n_steps or metadata['stopped_early']):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    
+    return result
+
+
+# Simulator reused by every job a process runs (see worker_simulator)
+_worker_simulator = None
+
+
+def worker_simulator(config: SimulationConfig) -> MonteCarloSimulator:
+    """
+    Return this process's shared simulator, reset to config (built on first use).
+    
+    Jobs run by run_parallel use it to reuse one simulator's packet storage
+    and grid across every job their worker process runs.
+    """
+    global _worker_simulator
+    if _worker_simulator is None:
+        _worker_simulator = MonteCarloSimulator(config)
+    else:
+        _worker_simulator.reset(config)
+    return _worker_simulator
+
+
+def _init_worker():
+    """Limit a worker process to one Numba thread (the pool already fills every core)."""
+    try:
+        import numba
+    except ImportError:
+        return
+    numba.set_num_threads(1)
+
+
+def run_parallel(fn: Callable, jobs: Iterable, n_workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, Any], None]] = None) -> List:
+    """
+    Run independent jobs (e.g. one simulation each) over a pool of worker processes.
+    
+    Workers are started with the "spawn" context, since forking a process that
+    has already loaded the compiled kernels can hang on exit (see kernels.py),
+    and each worker runs its kernels on one Numba thread. With a single job or
+    a single worker the jobs run in this process instead.
+    
+    Args:
+        fn: Module-level function applied to each job (it must be picklable)
+        jobs: Job arguments, one call of fn each
+        n_workers: Maximum number of worker processes (default: CPU count)
+        progress: Called as progress(n_done, result) after each job, in job order
+        
+    Returns:
+        List of fn(job) results, in job order
+    """
+    jobs = list(jobs)
+    n_workers = min(n_workers or os.cpu_count() or 1, len(jobs))
+    
+    if n_workers <= 1:
+        return _collect(map(fn, jobs), progress)
+    
+    with mp.get_context('spawn').Pool(n_workers, initializer=_init_worker) as pool:
+        return _collect(pool.imap(fn, jobs), progress)
+
+
+def _collect(results: Iterable, progress: Optional[Callable[[int, Any], None]]) -> List:
+    """Gather results into a list, reporting each one to progress as it arrives."""
+    collected = []
+    for result in results:
+        collected.append(result)
+        if progress is not None:
+            progress(len(collected), result)
+    return collected
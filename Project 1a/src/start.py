@@ -4,6 +4,8 @@ Main entry point for running the Monte Carlo heat diffusion simulation.
 Run this file from the src/ directory.
 """
 
+import sys
+
 # Import and run the main simulation
 from generate_required_results import generate_required_results
 
@@ -15,4 +17,5 @@ if __name__ == "__main__":
     print("="*60)
     print()
     
-    generate_required_results()
+    # --cache: reuse (and store) results in outputs/.sim_cache
+    generate_required_results(use_cache='--cache' in sys.argv[1:])
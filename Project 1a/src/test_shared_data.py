@@ -8,9 +8,11 @@ sys.path.append('src')
 
 from generate_required_results import generate_all_simulation_data
 
-print("Testing shared data generation...")
-data = generate_all_simulation_data()
-print(f"Copper Q=20 corrected temp: {data['copper'][20]['corrected_temp']:.1f}°C")
-print(f"Silver Q=20 corrected temp: {data['silver'][20]['corrected_temp']:.1f}°C")
-print(f"Steel Q=20 corrected temp: {data['steel_carbon'][20]['corrected_temp']:.1f}°C")
-print("✅ Shared data generation works!")
\ No newline at end of file
+# Guarded: the simulations run in spawned worker processes, which re-import this module
+if __name__ == "__main__":
+    print("Testing shared data generation...")
+    data = generate_all_simulation_data()
+    print(f"Copper Q=20 corrected temp: {data['copper'][20]['corrected_temp']:.1f}°C")
+    print(f"Silver Q=20 corrected temp: {data['silver'][20]['corrected_temp']:.1f}°C")
+    print(f"Steel Q=20 corrected temp: {data['steel_carbon'][20]['corrected_temp']:.1f}°C")
+    print("✅ Shared data generation works!")
\ No newline at end of file